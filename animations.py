@@ -1,70 +1,206 @@
 import tkinter as tk
 import math
+import time
+from logging_utils.profiler import profiled
 
-def fade_in(window, steps=10, delay=30):
-    """Fade in a Toplevel window (if supported)."""
-    def _fade(step):
-        alpha = step / steps
-        window.attributes('-alpha', alpha)
-        if step < steps:
-            window.after(delay, _fade, step + 1)
-    window.attributes('-alpha', 0)
-    _fade(0)
+# Target frame interval of the animation clock
+FRAME_MS = 16
+
+
+def linear(t):
+    return t
+
+def ease_in_quad(t):
+    return t * t
+
+def ease_out_quad(t):
+    return t * (2 - t)
+
+def ease_in_out_quad(t):
+    return 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) ** 2
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+def ease_in_out_sine(t):
+    return (1 - math.cos(math.pi * t)) / 2
+
+EASINGS = {
+    "linear": linear,
+    "ease_in": ease_in_quad,
+    "ease_out": ease_out_quad,
+    "ease_in_out": ease_in_out_quad,
+    "ease_out_cubic": ease_out_cubic,
+    "ease_in_out_sine": ease_in_out_sine,
+}
+
+
+class Animation:
+    """One running animation; `update` gets the eased progress from 0.0 to 1.0."""
+
+    def __init__(self, clock, key, duration, update, on_finish=None, on_cancel=None, easing=linear):
+        self.clock = clock
+        self.key = key
+        self.duration = max(duration, 1) / 1000
+        self.update = update
+        self.on_finish = on_finish
+        self.on_cancel = on_cancel
+        self.easing = EASINGS.get(easing, easing) if isinstance(easing, str) else easing
+        self.start = time.perf_counter()
+
+    def cancel(self):
+        self.clock.cancel(*self.key)
+
+
+class AnimationClock:
+    """
+    A single Tk timer that drives every running animation of a window.
+
+    Progress comes from elapsed wall time rather than a step count, so a
+    slow frame makes the next one jump ahead (counted in `dropped`) instead
+    of stretching the animation. Each widget runs at most one animation per
+    channel; starting another one replaces it.
+    """
+
+    def __init__(self, root, frame_ms=FRAME_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.active = {}  # (widget, channel) -> Animation
+        self.timer = None
+        self.last_tick = None
+        self.frames = 0
+        self.dropped = 0
+
+    def start(self, widget, duration, update, on_finish=None, on_cancel=None, easing=linear, channel="geometry"):
+        """Run update(progress) on every frame for duration ms, replacing the widget's animation on channel."""
+        self.cancel(widget, channel)
+        anim = Animation(self, (widget, channel), duration, update, on_finish, on_cancel, easing)
+        self.active[anim.key] = anim
+        update(anim.easing(0.0))
+        if self.timer is None:
+            self.last_tick = time.perf_counter()
+            self.timer = self.root.after(self.frame_ms, self._tick)
+        return anim
+
+    def cancel(self, widget, channel=None):
+        """Stop the widget's animation on channel (or on every channel) without finishing it."""
+        for key in [key for key in self.active if key[0] is widget and channel in (None, key[1])]:
+            anim = self.active.pop(key)
+            if anim.on_cancel:
+                anim.on_cancel()
+
+    @profiled("animation.tick")
+    def _tick(self):
+        now = time.perf_counter()
+        self.frames += 1
+        self.dropped += max(0, int((now - self.last_tick) * 1000 / self.frame_ms) - 1)
+        self.last_tick = now
+        for key, anim in list(self.active.items()):
+            if self.active.get(key) is not anim:
+                continue  # Replaced or cancelled by an earlier callback this frame
+            t = min(1.0, (now - anim.start) / anim.duration)
+            try:
+                anim.update(anim.easing(t))
+            except tk.TclError:
+                # The widget was destroyed mid-animation
+                self.active.pop(key, None)
+                continue
+            if t >= 1.0:
+                self.active.pop(key, None)
+                if anim.on_finish:
+                    anim.on_finish()
+        if self.active:
+            # Whatever this frame cost comes out of the wait for the next one
+            spent = int((time.perf_counter() - now) * 1000)
+            self.timer = self.root.after(max(1, self.frame_ms - spent), self._tick)
+        else:
+            self.timer = None
+
+
+_clocks = {}  # Tk root -> its AnimationClock, until the root is destroyed
+
+def get_clock(widget):
+    """The animation clock of the widget's Tk root, created on first use."""
+    root = widget._root()
+    clock = _clocks.get(root)
+    if clock is None:
+        clock = _clocks[root] = AnimationClock(root)
+        root.bind("<Destroy>", lambda e: _drop_clock(root, e), add="+")
+    return clock
+
+def _drop_clock(root, event):
+    # A binding on the root also fires for every widget destroyed inside it
+    if event.widget is root:
+        clock = _clocks.pop(root, None)
+        if clock is not None:
+            clock.active.clear()
+
+def animate(widget, duration, update, on_finish=None, on_cancel=None, easing=linear, channel="geometry"):
+    """Start an animation of widget on its window's clock."""
+    return get_clock(widget).start(widget, duration, update, on_finish, on_cancel, easing, channel)
+
+def cancel(widget, channel=None):
+    """Cancel the running animations of widget."""
+    get_clock(widget).cancel(widget, channel)
+
+
+def fade_in(window, steps=10, delay=30, easing=linear):
+    """Fade in a Toplevel window (if supported) over steps * delay ms."""
+    animate(window, steps * delay, lambda t: window.attributes('-alpha', t),
+            easing=easing, channel="alpha")
 
 def flash_bg(widget, flash_color="#ffff99", flashes=3, delay=150):
     """Flash a widget's background color."""
+    # An interrupted flash restores the color first, so it is not taken for the original
+    cancel(widget, "background")
     orig_color = widget.cget("background")
-    def _flash(count):
-        if count > 0:
-            widget.config(background=flash_color)
-            widget.after(delay, lambda: widget.config(background=orig_color))
-            widget.after(delay * 2, lambda: _flash(count - 1))
-        else:
-            widget.config(background=orig_color)
-    _flash(flashes)
+    def _restore():
+        widget.config(background=orig_color)
+    def _flash(t):
+        # Each flash is `delay` ms on and `delay` ms off
+        on = t < 1.0 and int(t * flashes * 2) % 2 == 0
+        widget.config(background=flash_color if on else orig_color)
+    animate(widget, flashes * delay * 2, _flash, on_finish=_restore, on_cancel=_restore, channel="background")
+
+def grow_from_center(widget, duration=600, steps=60, on_finish=None, easing=linear):
+    """
+    Animate a widget growing from the center.
 
-def grow_from_center(widget, duration=600, steps=60, on_finish=None):
-    """Animate a widget growing from the center."""
+    Frames are paced by the animation clock; steps is kept for compatibility.
+    """
+    cancel(widget, "geometry")
     widget.pack(expand=True, fill="both")
     widget.update_idletasks()
     w = widget.winfo_width()
     h = widget.winfo_height()
     widget.pack_forget()
-    widget.place(relx=0.5, rely=0.5, anchor="center", width=0, height=0)
-    def animate(step):
-        if step > steps:
-            widget.place(relx=0.5, rely=0.5, anchor="center", width=w, height=h)
-            widget.after(20, finish_transition)
-            return
-        frac = step / steps
+    def update(frac):
         widget.place(relx=0.5, rely=0.5, anchor="center",
                      width=int(w * frac), height=int(h * frac))
-        widget.after(duration // steps, animate, step + 1)
+    def finish():
+        widget.place(relx=0.5, rely=0.5, anchor="center", width=w, height=h)
+        widget.after(20, finish_transition)
     def finish_transition():
         widget.place_forget()
         if on_finish:
             on_finish()
-    animate(1)
+    animate(widget, duration, update, on_finish=finish, easing=easing)
 
-def slide(widget, duration=700, steps=30, direction="right", on_finish=None):
+def slide(widget, duration=700, steps=30, direction="right", on_finish=None, easing=linear):
     """
     Simple slide animation: slides the widget left or right and back.
+
+    Sliding a widget that is already sliding restarts it instead of queueing.
     """
+    cancel(widget, "geometry")
     widget.update_idletasks()
     w = widget.winfo_width()
     h = widget.winfo_height()
-    widget.place(relx=0.5, rely=0.5, anchor="center", width=w, height=h)
-    def animate(step):
-        frac = step / steps
-        if direction == "right":
-            offset = int(w * frac)
-        else:
-            offset = -int(w * frac)
-        widget.place(relx=0.5, rely=0.5, anchor="center", width=w, height=h, x=offset)
-        if step < steps:
-            widget.after(duration // steps, animate, step + 1)
-        else:
-            widget.place_forget()
-            if on_finish:
-                on_finish()
-    animate(0)
\ No newline at end of file
+    sign = 1 if direction == "right" else -1
+    def update(frac):
+        widget.place(relx=0.5, rely=0.5, anchor="center", width=w, height=h, x=sign * int(w * frac))
+    def finish():
+        widget.place_forget()
+        if on_finish:
+            on_finish()
+    animate(widget, duration, update, on_finish=finish, easing=easing)
@@ -0,0 +1,122 @@
+"""TodoApp benchmarks under a real or virtual X display."""
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from benchmarks.synthetic import write_tasks
+from benchmarks.timing import measure, summarize
+
+# Key presses handled before Tk gets idle, as with auto-repeat on a busy display
+BURST = 10
+
+
+@contextmanager
+def virtual_display():
+    """Yield True with a usable DISPLAY, starting Xvfb if needed; False if there is none."""
+    if os.environ.get("DISPLAY"):
+        yield True
+        return
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        yield False
+        return
+    number = 90 + os.getpid() % 100
+    proc = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    socket = f"/tmp/.X11-unix/X{number}"
+    deadline = time.monotonic() + 5
+    while not os.path.exists(socket) and proc.poll() is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    if not os.path.exists(socket):
+        proc.kill()
+        yield False
+        return
+    os.environ["DISPLAY"] = f":{number}"
+    try:
+        yield True
+    finally:
+        del os.environ["DISPLAY"]
+        proc.terminate()
+        proc.wait()
+
+
+def run(sizes, renderer=None, seed=0):
+    """Return {name: summary} for the TodoApp benchmarks, or {"skipped": reason}."""
+    with virtual_display() as available:
+        if not available:
+            return {"skipped": "no DISPLAY and Xvfb is not installed"}
+        try:
+            import tkinter as tk
+            from logging_utils import log_handler
+            from task_manager import TodoApp
+        except ImportError as e:
+            return {"skipped": f"tkinter unavailable: {e}"}
+
+        results = {}
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                # TaskManager() inside TodoApp reads these module paths
+                log_handler.LOG_FILE = os.path.join(tmp, "todo_tasks.json")
+                log_handler.CFG_FILE = os.path.join(tmp, "window_cfg.json")
+                # Keep every synthetic task in the list instead of archiving the old completed ones
+                log_handler.ARCHIVE_DAYS = 0
+                write_tasks(log_handler.LOG_FILE, size, seed)
+                prefix = f"gui.{renderer or 'default'}.n={size}"
+                apps = []
+
+                def start():
+                    root = tk.Tk()
+                    root.geometry("1000x600")
+                    apps.append(TodoApp(root, renderer=renderer))
+                    root.update()
+
+                results[f"{prefix}.startup"] = measure(start, 3, setup=lambda: apps and apps.pop().on_close())
+                apps.pop().on_close()
+
+                # Progressive startup: window first, tasks streamed in by a worker thread
+                milestones = []
+                for _ in range(3):
+                    root = tk.Tk()
+                    root.geometry("1000x600")
+                    app = TodoApp(root, renderer=renderer, progressive=True)
+                    while "interactive" not in app.startup:
+                        root.update()
+                        time.sleep(0.001)
+                    milestones.append(app.startup)
+                    app.on_close()
+                for name in ("first_paint", "first_rows", "interactive"):
+                    samples = [m[name] / 1000 for m in milestones if name in m]
+                    if samples:
+                        results[f"{prefix}.progressive.{name}"] = summarize(samples)
+
+                start()
+                app = apps.pop()
+                root = app.root
+
+                def render():
+                    app.display_tasks()
+                    root.update_idletasks()
+
+                def select():
+                    app.select_next_row()
+                    root.update_idletasks()
+
+                def theme():
+                    app.toggle_theme()
+                    root.update_idletasks()
+
+                def burst():
+                    for _ in range(BURST):
+                        app.select_next_row()
+                    root.update_idletasks()
+
+                results[f"{prefix}.render"] = measure(render, 10)
+                results[f"{prefix}.select"] = measure(select, 50)
+                results[f"{prefix}.select_burst{BURST}"] = measure(burst, 10)
+                results[f"{prefix}.theme"] = measure(theme, 6)
+                # Repaints requested vs. done; not a timing, so --compare skips it
+                results[f"{prefix}.scheduler"] = app.scheduler.stats()
+                app.on_close()
+        return results
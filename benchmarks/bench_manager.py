@@ -0,0 +1,44 @@
+"""TaskManager benchmarks: load, save and single-task mutations."""
+import os
+import random
+import tempfile
+from benchmarks.synthetic import write_tasks
+from benchmarks.timing import measure
+from logging_utils.log_handler import TaskManager
+
+
+def ops_for(size):
+    # Fewer repetitions on big lists, where every save rewrites the whole file
+    return max(3, min(50, 100000 // size))
+
+
+def run(sizes, storage="json", seed=0):
+    """Return {name: summary} for every TaskManager benchmark at every size."""
+    results = {}
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "todo_tasks.json")
+            write_tasks(path, size, seed)
+            ops = ops_for(size)
+            rng = random.Random(seed)
+            prefix = f"manager.{storage}.n={size}"
+
+            def load():
+                TaskManager(path, storage=storage).close()
+
+            load()  # First load may migrate or normalize the file
+            results[f"{prefix}.load"] = measure(load, 3)
+
+            manager = TaskManager(path, storage=storage)
+            count = lambda: len(manager.tasks)
+            results[f"{prefix}.save"] = measure(manager.save_tasks, 3)
+            results[f"{prefix}.add"] = measure(
+                lambda: manager.add_task("benchmark task", "2025-05-01 12:00:00", "Medium", "2025-06-01"), ops)
+            results[f"{prefix}.toggle"] = measure(lambda: manager.toggle_complete(rng.randrange(count())), ops)
+            results[f"{prefix}.update"] = measure(
+                lambda: manager.update_task(rng.randrange(count()), desc="edited task", priority="High"), ops)
+            results[f"{prefix}.reorder"] = measure(
+                lambda: manager.move_task(rng.randrange(count()), rng.randrange(count())), ops)
+            results[f"{prefix}.delete"] = measure(lambda: manager.delete_task(rng.randrange(count())), ops)
+            manager.close()
+    return results
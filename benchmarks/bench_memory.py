@@ -0,0 +1,33 @@
+"""Memory held per task: the list as parsed from JSON versus as Task objects."""
+import gc
+import json
+import tracemalloc
+from benchmarks.synthetic import make_tasks
+from logging_utils.task import Task
+
+
+def traced_bytes(build):
+    """Bytes still allocated by build() once it returns, and its result."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return size, result
+
+
+def run(sizes, seed=0):
+    """Return {name: bytes per task} for the dict and Task representations at every size."""
+    results = {}
+    for size in sizes:
+        text = json.dumps(make_tasks(size, seed))
+        prefix = f"memory.n={size}"
+        dict_bytes, _ = traced_bytes(lambda: json.loads(text))
+        task_bytes, _ = traced_bytes(lambda: [Task(task) for task in json.loads(text)])
+        results[f"{prefix}.dict_bytes_per_task"] = round(dict_bytes / size, 1)
+        results[f"{prefix}.task_bytes_per_task"] = round(task_bytes / size, 1)
+        results[f"{prefix}.saved"] = round(1 - task_bytes / dict_bytes, 3)
+    return results
@@ -0,0 +1,98 @@
+"""
+Run the benchmarks and report JSON.
+
+    python -m benchmarks.run                       # 1k/10k/100k, JSON on stdout
+    python -m benchmarks.run -o results.json --save-baseline
+    python -m benchmarks.run --compare             # fail on regressions vs the baseline
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def compare(results, baseline, threshold):
+    """Ratio of each median to the baseline; names slower by more than threshold are regressions."""
+    report, regressions = {}, []
+    for name, summary in results.items():
+        base = baseline.get(name)
+        if not isinstance(summary, dict) or not isinstance(base, dict) or "median_ms" not in summary:
+            continue
+        ratio = summary["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        report[name] = {"baseline_ms": base["median_ms"], "median_ms": summary["median_ms"],
+                        "ratio": round(ratio, 3)}
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return report, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TaskManager and TodoApp benchmarks")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated task counts")
+    parser.add_argument("--gui-sizes", default=None, help="task counts for the GUI benchmarks (default: --sizes)")
+    parser.add_argument("--storage", default="json", help="TaskManager backend: json, journal or sqlite")
+    parser.add_argument("--renderer", default=None, help="TodoApp renderer: labels, canvas or tree")
+    parser.add_argument("--no-gui", action="store_true", help="skip the TodoApp benchmarks")
+    parser.add_argument("--no-memory", action="store_true", help="skip the bytes-per-task measurements")
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--save-baseline", action="store_true", help=f"store the results as {BASELINE}")
+    parser.add_argument("--compare", nargs="?", const=BASELINE, metavar="BASELINE",
+                        help="compare with a baseline file and exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # The manager benchmarks never touch tkinter
+    from benchmarks import bench_manager
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = bench_manager.run(sizes, storage=args.storage)
+    if not args.no_memory:
+        from benchmarks import bench_memory
+        results.update(bench_memory.run(sizes))
+    if not args.no_gui:
+        from benchmarks import bench_gui
+        gui_sizes = [int(s) for s in (args.gui_sizes or args.sizes).split(",")]
+        gui = bench_gui.run(gui_sizes, renderer=args.renderer)
+        if "skipped" in gui:
+            print(f"GUI benchmarks skipped: {gui['skipped']}", file=sys.stderr)
+            results["gui.skipped"] = gui["skipped"]
+        else:
+            results.update(gui)
+
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": args.storage,
+            "renderer": args.renderer,
+        },
+        "results": results,
+    }
+    status = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        report["comparison"], regressions = compare(results, baseline, args.threshold)
+        for name in regressions:
+            print(f"REGRESSION {name}: x{report['comparison'][name]['ratio']}", file=sys.stderr)
+        report["regressions"] = regressions
+        status = 1 if regressions else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(BASELINE, "w") as f:
+            f.write(text + "\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+"""Synthetic task lists for the benchmarks."""
+import json
+import random
+from datetime import datetime, timedelta
+from logging_utils.records import initial_ranks, new_id
+
+PRIORITIES = ["Low", "Medium", "High"]
+WORDS = ("review report invoice meeting call email draft plan fix deploy "
+         "update budget design test release notes team client follow-up").split()
+
+
+def make_tasks(count, seed=0):
+    """Return count tasks in the on-disk format, with a mix of priorities, due dates and completion."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    tasks = []
+    for rank in initial_ranks(count):
+        added = start + timedelta(minutes=rng.randrange(500000))
+        tasks.append({
+            "id": new_id(),
+            "rank": rank,
+            "desc": " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))),
+            "timestamp": added.strftime("%Y-%m-%d %H:%M:%S"),
+            "completed": rng.random() < 0.3,
+            "priority": rng.choice(PRIORITIES),
+            "due_date": (added + timedelta(days=rng.randint(-10, 60))).strftime("%Y-%m-%d"),
+        })
+    return tasks
+
+
+def write_tasks(path, count, seed=0):
+    """Write a synthetic task file the way JsonStorage does."""
+    with open(path, "w") as f:
+        json.dump(make_tasks(count, seed), f, indent=2)
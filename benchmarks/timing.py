@@ -0,0 +1,26 @@
+"""Timing helpers shared by the benchmarks."""
+import statistics
+import time
+
+
+def summarize(samples):
+    """Summary of a list of durations in seconds, reported in milliseconds."""
+    ms = [s * 1000 for s in samples]
+    return {
+        "median_ms": round(statistics.median(ms), 4),
+        "min_ms": round(min(ms), 4),
+        "max_ms": round(max(ms), 4),
+        "runs": len(ms),
+    }
+
+
+def measure(fn, runs, setup=None):
+    """Time fn() runs times; setup(), if given, runs untimed before each call."""
+    samples = []
+    for i in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
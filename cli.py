@@ -0,0 +1,272 @@
+"""
+Command-line access to the task list, without Tk.
+
+    python cli.py add "Call Bob" --priority High --due 2025-06-01
+    python cli.py complete <id or position>...
+    python cli.py delete <id or position>...
+    python cli.py move <id or position>... --to 1
+    python cli.py list --open --priority High --sort due_date --format csv
+    python cli.py import --format ndjson < tasks.ndjson
+
+Positions are 1-based, in list order. Output is written as it is produced,
+so `list` can be piped into head or another program on any list size.
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from datetime import datetime
+from itertools import islice
+from logging_utils.archive import TIMESTAMP_FORMAT
+from logging_utils.log_handler import TaskManager
+from logging_utils.search_index import PRIORITY_FACETS, parse_query
+from logging_utils.sort_index import SORT_KEYS
+from logging_utils.storage import DUE_FORMAT
+from logging_utils.task import as_dict
+
+# Tasks parsed from stdin and added per step of an import
+IMPORT_CHUNK = 5000
+FIELDS = ("id", "desc", "priority", "due_date", "completed", "timestamp")
+
+
+def priority(value):
+    """A priority name from any capitalization; raises ValueError for others."""
+    name = PRIORITY_FACETS.get((value or "").lower())
+    if name is None:
+        raise ValueError(f"priority must be Low, Medium or High, not {value!r}")
+    return name
+
+
+def due_date(value):
+    """A YYYY-MM-DD due date, or "" for none; raises ValueError for others."""
+    if value:
+        datetime.strptime(value, DUE_FORMAT)
+    return value or ""
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "x", "done")
+
+
+def make_item(fields, now):
+    """A bulk_add item from imported fields; raises ValueError on bad values."""
+    desc = (fields.get("desc") or "").strip()
+    if not desc:
+        raise ValueError("desc is required")
+    return {
+        "desc": desc,
+        "priority": priority(fields.get("priority") or "Medium"),
+        "due_date": due_date(fields.get("due_date")),
+        "timestamp": fields.get("timestamp") or now,
+        "completed": _flag(fields.get("completed", False)),
+    }
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, field dict or ValueError) for each record of an ndjson or csv stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"invalid JSON: {e}")
+            continue
+        yield number, fields if isinstance(fields, dict) else ValueError("expected a JSON object")
+
+
+def import_tasks(manager, stream, fmt, chunk=IMPORT_CHUNK, errors=sys.stderr):
+    """
+    Add the tasks of a stream, chunk records at a time, and persist them with one save.
+
+    Bad records are reported to errors and skipped. Returns (added, skipped).
+    """
+    added = skipped = 0
+    now = datetime.now().strftime(TIMESTAMP_FORMAT)
+    rows = read_rows(stream, fmt)
+    # No undo history for a script: it would only be evicted again
+    with manager.history.paused(), manager.batch():
+        while True:
+            records = list(islice(rows, chunk))
+            if not records:
+                break
+            items = []
+            for number, fields in records:
+                try:
+                    if isinstance(fields, ValueError):
+                        raise fields
+                    items.append(make_item(fields, now))
+                except ValueError as e:
+                    print(f"line {number}: {e}", file=errors)
+                    skipped += 1
+            ids = manager.bulk_add(items)
+            done = [task_id for task_id, item in zip(ids, items) if item["completed"]]
+            if done:
+                manager.bulk_toggle(done, completed=True)
+            added += len(ids)
+    return added, skipped
+
+
+def resolve(manager, refs):
+    """Task ids for ids or 1-based positions; raises KeyError naming the first unknown one."""
+    ids = []
+    for ref in refs:
+        if ref in manager.by_id:
+            ids.append(ref)
+        elif ref.isdigit() and 1 <= int(ref) <= len(manager.tasks):
+            ids.append(manager.tasks[int(ref) - 1]["id"])
+        else:
+            raise KeyError(ref)
+    return ids
+
+
+def select(manager, args):
+    """Lazily yield the tasks a list command asks for."""
+    query = " ".join(filter(None, [
+        args.search,
+        "is:done" if args.done else None,
+        "is:open" if args.open else None,
+        "is:overdue" if args.overdue else None,
+    ] + [f"p:{name.lower()}" for name in args.priority or ()]))
+    if args.archived:
+        terms, status, priorities = parse_query(query)
+        if args.sort:
+            yield from manager.search_archive(terms, status, priorities, args.sort, args.reverse)
+        else:
+            yield from manager.archive.search(terms, status, priorities)
+        return
+    hits = manager.search(query, order=args.sort, descending=args.reverse)
+    if hits is not None:
+        yield from hits
+    elif args.sort:
+        yield from manager.sorted_view(args.sort, args.reverse)
+    else:
+        yield from reversed(manager.tasks) if args.reverse else manager.tasks
+
+
+def print_tasks(manager, tasks, fmt, out):
+    """Write tasks to out one by one as text columns, ndjson or csv."""
+    if fmt == "ndjson":
+        for task in tasks:
+            out.write(json.dumps(task, ensure_ascii=False, default=as_dict) + "\n")
+    elif fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(("position",) + FIELDS)
+        for task in tasks:
+            writer.writerow((_position(manager, task),) + tuple(task.get(name, "") for name in FIELDS))
+    else:
+        for task in tasks:
+            out.write(f"{_position(manager, task):>6}  [{'x' if task.get('completed') else ' '}] "
+                      f"{task.get('priority', 'Medium'):<6}  {task.get('due_date') or '-':<10}  "
+                      f"{task['id']}  {task.get('desc', '')}\n")
+
+
+def _position(manager, task):
+    # 1-based list position; archived tasks have none
+    if task["id"] not in manager.by_id:
+        return "-"
+    return manager.index_of(task["id"]) + 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Manage the to-do list without the GUI.")
+    parser.add_argument("--storage", choices=("json", "journal", "sqlite"),
+                        help="backend (default: TODO_STORAGE or json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="add a task")
+    add.add_argument("desc", nargs="+")
+    add.add_argument("--priority", type=priority, default="Medium")
+    add.add_argument("--due", type=due_date, default="", metavar="YYYY-MM-DD")
+
+    complete = commands.add_parser("complete", help="mark tasks done")
+    complete.add_argument("tasks", nargs="+", metavar="task")
+    complete.add_argument("--open", action="store_true", help="mark them open again instead")
+
+    delete = commands.add_parser("delete", help="delete tasks")
+    delete.add_argument("tasks", nargs="+", metavar="task")
+
+    restore = commands.add_parser("restore", help="move archived tasks back to the list")
+    restore.add_argument("tasks", nargs="+", metavar="id", help="task ids, as shown by list --archived")
+
+    move = commands.add_parser("move", help="move tasks, in list order, to a position")
+    move.add_argument("tasks", nargs="+", metavar="task")
+    move.add_argument("--to", type=int, required=True, metavar="POSITION")
+
+    listing = commands.add_parser("list", help="print tasks")
+    status = listing.add_mutually_exclusive_group()
+    status.add_argument("--done", action="store_true", help="completed tasks only")
+    status.add_argument("--open", action="store_true", help="open tasks only")
+    listing.add_argument("--overdue", action="store_true", help="overdue tasks only")
+    listing.add_argument("--priority", type=priority, action="append", help="repeat for several")
+    listing.add_argument("--search", help="words matched as prefixes, as in the search bar")
+    listing.add_argument("--archived", action="store_true", help="list the archive instead")
+    listing.add_argument("--sort", choices=sorted(SORT_KEYS), help="order (default: list order)")
+    listing.add_argument("--reverse", action="store_true")
+    listing.add_argument("--limit", type=int)
+    listing.add_argument("--format", choices=("text", "ndjson", "csv"), default="text")
+
+    imports = commands.add_parser("import", help="add tasks from stdin in one save")
+    imports.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    imports.add_argument("--chunk", type=int, default=IMPORT_CHUNK, help="records parsed per step")
+    return parser
+
+
+def main(argv=None, stdin=None, stdout=None):
+    args = build_parser().parse_args(argv)
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    manager = TaskManager(storage=args.storage)
+    try:
+        if args.command == "add":
+            now = datetime.now().strftime(TIMESTAMP_FORMAT)
+            print(manager.add_task(" ".join(args.desc), now, args.priority, args.due), file=stdout)
+        elif args.command == "import":
+            if stdin is sys.stdin:
+                stdin = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+            added, skipped = import_tasks(manager, stdin, args.format, args.chunk)
+            print(f"Imported {added} tasks" + (f", skipped {skipped}" if skipped else ""), file=sys.stderr)
+            return 1 if skipped else 0
+        elif args.command == "list":
+            tasks = select(manager, args)
+            if args.limit is not None:
+                tasks = islice(tasks, args.limit)
+            print_tasks(manager, tasks, args.format, stdout)
+        elif args.command == "restore":
+            restored = manager.restore_archived(args.tasks)
+            missing = [task_id for task_id in args.tasks if task_id not in restored]
+            if missing:
+                print(f"No archived task {missing[0]!r}", file=sys.stderr)
+                return 1
+        else:
+            try:
+                ids = resolve(manager, args.tasks)
+            except KeyError as e:
+                print(f"No task {e.args[0]!r}", file=sys.stderr)
+                return 1
+            if args.command == "complete":
+                manager.bulk_toggle(ids, completed=not args.open)
+            elif args.command == "delete":
+                manager.bulk_delete(ids)
+            else:
+                manager.bulk_move(ids, args.to - 1)
+        return 0
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except BrokenPipeError:
+        # The reader went away, e.g. `cli.py list | head`; nothing left to report
+        sys.stderr.close()
+        sys.exit(0)
@@ -0,0 +1,134 @@
+"""
+Single-instance daemon: a resident TodoApp that takes commands over a Unix socket.
+
+The client half (send) imports neither tkinter nor the app, so a launch
+that finds a daemon running costs a connect and one line of text.
+"""
+import os
+import socket
+
+# TODO_SOCKET overrides where the daemon listens (tempfile is not used: it is slow to import)
+SOCKET_PATH = os.environ.get("TODO_SOCKET") or os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp",
+    f"todo-{os.getuid()}.sock" if hasattr(os, "getuid") else "todo.sock"
+)
+# Unix sockets and Tk file handlers are not available on Windows
+SUPPORTED = hasattr(socket, "AF_UNIX") and os.name == "posix"
+# How long either side waits for the other's line
+TIMEOUT = 2.0
+MAX_LINE = 64 * 1024
+COMMANDS = ("show", "hide", "toggle", "focus", "add", "quit")
+
+
+def _read_line(sock):
+    data = b""
+    while not data.endswith(b"\n") and len(data) < MAX_LINE:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode("utf-8", "replace").strip()
+
+
+def send(command, path=SOCKET_PATH, timeout=TIMEOUT):
+    """Send one command to a running daemon; returns its reply, or None if no daemon answers."""
+    if not SUPPORTED:
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(" ".join(command.split("\n")).encode("utf-8") + b"\n")
+            return _read_line(sock)
+    except OSError:
+        # No socket, a stale one left by a crash, or a daemon that stopped responding
+        return None
+
+
+class CommandServer:
+    """
+    Listens on the socket from inside the app's Tk event loop.
+
+    The listening socket is registered as a Tk file handler, so connections
+    are served on the main thread between events and there is no polling.
+    Each connection carries one command line and gets one reply line.
+    """
+
+    def __init__(self, app, path=SOCKET_PATH):
+        self.app = app
+        self.path = path
+        self.sock = None
+        self.inode = None
+
+    def start(self):
+        """Bind the socket; False if another daemon already owns it."""
+        if send("ping", self.path) is not None:
+            return False
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Left behind by a daemon that did not exit cleanly
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            self.sock.bind(self.path)
+        finally:
+            os.umask(old_umask)
+        self.sock.listen(8)
+        self.inode = os.stat(self.path).st_ino
+        import tkinter
+        self.app.root.tk.createfilehandler(self.sock, tkinter.READABLE, self._on_readable)
+        return True
+
+    def _on_readable(self, sock, mask):
+        try:
+            conn, _ = self.sock.accept()
+        except OSError:
+            return
+        with conn:
+            try:
+                conn.settimeout(TIMEOUT)
+                reply = self.dispatch(_read_line(conn))
+                conn.sendall(reply.encode("utf-8") + b"\n")
+            except OSError:
+                pass
+
+    def dispatch(self, line):
+        """Run one command line, e.g. "add Buy milk"; returns the reply."""
+        name, _, arg = line.partition(" ")
+        if name == "ping":
+            return "ok"
+        if name not in COMMANDS:
+            return f"error: unknown command {name!r} (expected {', '.join(COMMANDS)})"
+        if name == "add":
+            if not arg.strip():
+                return "error: add needs a task description"
+            self.app.quick_add(arg.strip())
+        elif name == "quit":
+            # Let the reply go out before the window and the socket go away
+            self.app.root.after_idle(self.app.quit)
+        else:
+            getattr(self.app, {"show": "show", "hide": "hide", "toggle": "toggle_visible",
+                               "focus": "focus_entry"}[name])()
+        return "ok"
+
+    def close(self):
+        if self.sock is None:
+            return
+        try:
+            self.app.root.tk.deletefilehandler(self.sock)
+        except Exception:
+            pass  # The Tk interpreter is already gone
+        self.sock.close()
+        self.sock = None
+        # Only remove the socket file if a newer daemon has not replaced it
+        try:
+            if os.stat(self.path).st_ino == self.inode:
+                os.unlink(self.path)
+        except OSError:
+            pass
+
+
+def parse_args(argv):
+    """Split main.py arguments into (flags, command line); the command defaults to "show"."""
+    flags = {arg for arg in argv if arg.startswith("--")}
+    command = " ".join(arg for arg in argv if not arg.startswith("--"))
+    return flags, command or "show"
@@ -0,0 +1,168 @@
+import gzip
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+from logging_utils.search_index import tokenize
+from logging_utils.task import Task, as_dict, time_of
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Completed tasks older than this many days move to the archive; 0 turns it off
+ARCHIVE_AGE_DAYS = 30
+# Tasks per gzip member; a member is the unit that is compressed and appended at once
+ARCHIVE_CHUNK = 500
+
+
+def stamp_completed(tasks, now=None):
+    """
+    Give completed Task objects without a completed_at a finish time of now.
+
+    Files from before completed_at was recorded do not say when a task was
+    done; counting them as done on the first load after an upgrade keeps
+    them out of the archive for another max_age_days rather than archiving
+    everything created long ago. Returns True if any task changed.
+    """
+    stamp = None
+    for task in tasks:
+        if task.completed and task.completed_at is None:
+            stamp = stamp or (now or datetime.now()).strftime(TIMESTAMP_FORMAT)
+            task["completed_at"] = stamp
+    return stamp is not None
+
+
+def completed_since(task):
+    """When a completed task was finished (its creation time if that is missing), or None."""
+    for field in ("completed_at", "timestamp"):
+        since = time_of(task, field)
+        if since is not None:
+            return since
+    return None
+
+
+def archivable(tasks, max_age_days, now=None):
+    """The completed tasks finished more than max_age_days ago."""
+    if max_age_days <= 0:
+        return []
+    cutoff = (now or datetime.now()) - timedelta(days=max_age_days)
+    result = []
+    for task in tasks:
+        if task.get("completed", False):
+            since = completed_since(task)
+            if since is not None and since < cutoff:
+                result.append(task)
+    return result
+
+
+def _write_members(f, tasks):
+    # Whole gzip members of at most ARCHIVE_CHUNK tasks, synced to disk
+    for start in range(0, len(tasks), ARCHIVE_CHUNK):
+        lines = "".join(json.dumps(task, ensure_ascii=False, default=as_dict) + "\n"
+                        for task in tasks[start:start + ARCHIVE_CHUNK])
+        f.write(gzip.compress(lines.encode("utf-8")))
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class Archive:
+    """
+    Append-only cold store for old completed tasks, as gzip-compressed JSON lines.
+
+    Every append writes whole gzip members of at most ARCHIVE_CHUNK tasks
+    to the end of the file, so nothing written before is read or rewritten,
+    and gzip readers see one continuous stream. Only remove(), for tasks
+    restored to the list, rewrites the file. Tasks are only decoded when
+    the archive is opened or searched: load() reads it all once and caches
+    the list, while search() streams it line by line and keeps just the
+    matches. A member cut short by a crash is skipped when reading.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tasks = None  # Cached by load()
+
+    def exists(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def append(self, tasks):
+        """Write tasks to the end of the archive and sync them to disk."""
+        if not tasks:
+            return
+        with open(self.path, "ab") as f:
+            _write_members(f, tasks)
+        if self.tasks is not None:
+            self.tasks.extend(Task(task) for task in tasks)
+
+    def remove(self, task_ids):
+        """Rewrite the archive without the tasks with these ids; returns how many were dropped."""
+        task_ids = set(task_ids)
+        tasks = list(self)
+        kept = [task for task in tasks if task.id not in task_ids]
+        if len(kept) == len(tasks):
+            return 0
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            _write_members(f, kept)
+        os.replace(tmp, self.path)
+        if self.tasks is not None:
+            self.tasks = kept
+        return len(tasks) - len(kept)
+
+    def _lines(self):
+        # Decoded lines of every complete member, read a block at a time
+        if not self.exists():
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.endswith("\n"):
+                        yield line
+            except (EOFError, gzip.BadGzipFile, zlib.error):
+                # Torn write at the end of the file
+                return
+
+    def _decode(self, lines):
+        # A crash between archiving and saving the hot list archives a task twice
+        seen = set()
+        for line in lines:
+            task = Task(json.loads(line))
+            if task.get("id") not in seen:
+                seen.add(task.get("id"))
+                yield task
+
+    def __iter__(self):
+        """Stream the archived tasks in the order they were archived."""
+        return self._decode(self._lines())
+
+    def load(self):
+        """Every archived task; read on the first call only."""
+        if self.tasks is None:
+            self.tasks = list(self)
+        return self.tasks
+
+    def search(self, terms=(), status=(), priorities=()):
+        """
+        Stream the archived tasks matching parse_query() terms and facets.
+
+        Words match as prefixes of description words, as in SearchIndex.
+        Lines that cannot contain every word are skipped without parsing
+        them, and the archive is never held in memory as a whole.
+        """
+        if "open" in status or "overdue" in status:
+            return  # Archived tasks are all done
+        if self.tasks is not None:
+            source = self.tasks
+        else:
+            source = self._decode(line for line in self._lines()
+                                  if all(term in line.lower() for term in terms))
+        for task in source:
+            if priorities and task.get("priority") not in priorities:
+                continue
+            if terms:
+                tokens = tokenize(task.get("desc", ""))
+                if not all(any(token.startswith(term) for token in tokens) for term in terms):
+                    continue
+            yield task
+
+    def count(self):
+        """Number of archived tasks."""
+        return len(self.tasks) if self.tasks is not None else sum(1 for _ in self)
@@ -0,0 +1,74 @@
+import heapq
+from datetime import datetime
+from logging_utils.task import time_of
+
+
+class DueIndex:
+    """
+    Parsed due dates and overdue flags for a task list.
+
+    A task is overdue once its due date has passed and it is not completed.
+    Incomplete tasks that are not overdue yet sit in a min-heap keyed by due
+    instant, so the next moment any flag flips is known without a scan.
+    Heap entries are dropped lazily once they no longer match `_upcoming`.
+    """
+
+    def __init__(self):
+        self.due = {}  # task id -> parsed due datetime (or None)
+        self.overdue = set()  # ids of tasks currently overdue
+        self._upcoming = {}  # task id -> due datetime still in the future
+        self._heap = []
+
+    def rebuild(self, tasks, now=None):
+        self.due.clear()
+        self.overdue.clear()
+        self._upcoming.clear()
+        self._heap = []
+        now = now or datetime.now()
+        for task in tasks:
+            self.add(task, now)
+
+    def add(self, task, now=None):
+        """Index or re-index one task after its due date or completion changed."""
+        task_id = task["id"]
+        due = time_of(task, "due_date")
+        self.due[task_id] = due
+        self.overdue.discard(task_id)
+        self._upcoming.pop(task_id, None)
+        if due is None or task.get("completed", False):
+            return
+        if due < (now or datetime.now()):
+            self.overdue.add(task_id)
+        else:
+            self._upcoming[task_id] = due
+            heapq.heappush(self._heap, (due, task_id))
+
+    def remove(self, task_id):
+        self.due.pop(task_id, None)
+        self.overdue.discard(task_id)
+        self._upcoming.pop(task_id, None)
+
+    def is_overdue(self, task_id):
+        return task_id in self.overdue
+
+    def next_due(self):
+        """The next instant at which some task becomes overdue, or None."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def refresh(self, now=None):
+        """Flag every task whose due instant has passed; return the ids that changed."""
+        now = now or datetime.now()
+        changed = set()
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] >= now:
+                return changed
+            _, task_id = heapq.heappop(self._heap)
+            del self._upcoming[task_id]
+            self.overdue.add(task_id)
+            changed.add(task_id)
+
+    def _drop_stale(self):
+        while self._heap and self._upcoming.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
@@ -0,0 +1,101 @@
+from collections import deque
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+# Default memory budget for the undo and redo stacks together
+UNDO_BUDGET = 1024 * 1024
+
+
+def delta_size(value):
+    """Rough number of bytes a delta keeps alive."""
+    if isinstance(value, Mapping):
+        return 64 + sum(delta_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(8 + delta_size(v) for v in value)
+    if isinstance(value, str):
+        return 49 + len(value)
+    return 28
+
+
+class History:
+    """
+    Bounded undo/redo log of mutation deltas.
+
+    Each entry is a list of deltas recorded by TaskManager, such as
+    {"op": "update", "id", "before", "after"} or {"op": "move", "id", "from",
+    "to"}, so an entry costs the size of the change, not of the task list.
+    The oldest entries are evicted once the estimated size of both stacks
+    exceeds the budget.
+    """
+
+    def __init__(self, budget=UNDO_BUDGET):
+        self.budget = budget
+        self.undo_stack = deque()  # (deltas, size), newest last
+        self.redo_stack = []
+        self.size = 0
+        self._group = None
+        self._paused = 0
+
+    def record(self, delta):
+        """Log one delta as its own entry, or as part of the open group."""
+        if self._paused:
+            return
+        if self._group is not None:
+            self._group.append(delta)
+        else:
+            self._push([delta])
+
+    def _push(self, deltas):
+        for _, size in self.redo_stack:
+            self.size -= size
+        self.redo_stack.clear()
+        size = delta_size(deltas)
+        self.undo_stack.append((deltas, size))
+        self.size += size
+        while self.size > self.budget and self.undo_stack:
+            _, evicted = self.undo_stack.popleft()
+            self.size -= evicted
+
+    @contextmanager
+    def group(self):
+        """Record every delta made inside the block as a single entry."""
+        if self._group is not None:
+            yield
+            return
+        self._group = []
+        try:
+            yield
+        finally:
+            deltas, self._group = self._group, None
+            if deltas:
+                self._push(deltas)
+
+    @contextmanager
+    def paused(self):
+        """Apply changes without recording them, e.g. while undoing."""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def pop_undo(self):
+        """Deltas of the newest entry, moved onto the redo stack; None if empty."""
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        return entry[0]
+
+    def pop_redo(self):
+        """Deltas of the last undone entry, moved back onto the undo stack; None if empty."""
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        return entry[0]
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = 0
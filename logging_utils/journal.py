@@ -0,0 +1,210 @@
+import os
+import json
+import hashlib
+import threading
+from logging_utils.records import apply_record
+from logging_utils.task import Task, as_dict
+
+# Fold the journal into a fresh snapshot once it grows past this many bytes
+COMPACT_BYTES = 256 * 1024
+
+
+def atomic_write(path, data):
+    """Write bytes to path through a temp file and os.replace."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# The C encoder does not indent; this item separator puts each field of a
+# task on its own line, the way json.dumps(tasks, indent=2) does
+_encode_fields = json.JSONEncoder(separators=(",\n    ", ": ")).encode
+
+
+def encode_snapshot(tasks):
+    """Serialize a task list in the on-disk snapshot format: the bytes json.dumps(tasks, indent=2) writes."""
+    if not tasks:
+        return b"[]"
+    # One pass of the C encoder, then only whitespace is added around the
+    # objects. Encoded strings never hold a raw newline, so "},\n" can only
+    # be the end of a task (or, with nested values, of something inside one).
+    text = _encode_fields([task.to_dict() if isinstance(task, Task) else task for task in tasks])
+    return ("[\n  {\n    " + text[2:-2].replace("},\n    {", "\n  },\n  {\n    ") + "\n  }\n]").encode("utf-8")
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+class Journal:
+    """
+    Append-only log of task mutations stored next to the JSON snapshot.
+
+    The first line of the journal names the snapshot it applies to (a hash
+    of the snapshot bytes), so after a crash in the middle of a compaction a
+    journal that was already folded into the snapshot is never replayed twice.
+    """
+
+    def __init__(self, snapshot_path, compact_bytes=COMPACT_BYTES):
+        self.snapshot_path = snapshot_path
+        self.path = os.path.splitext(snapshot_path)[0] + ".journal"
+        self.pending_path = self.path + ".new"
+        self.compact_bytes = compact_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._size = 0
+        self._header_size = 0
+        self._worker = None
+
+    def load(self):
+        """Read the snapshot, replay the journal over it and open it for appends."""
+        data = b""
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as f:
+                data = f.read()
+        try:
+            tasks = json.loads(data) if data else []
+        except ValueError:
+            tasks = []
+        base = _digest(data)
+        self._recover(base)
+
+        records = self._read_records(base)
+        if records is None:
+            # Missing or stale journal: start a fresh one for this snapshot
+            self._start_journal(base, b"")
+        else:
+            # Records are replayed onto Task objects, which apply_record reads by slot
+            tasks = [Task(task) for task in tasks]
+            by_id = {task["id"]: task for task in tasks if "id" in task}
+            for record in records:
+                if record["op"] == "add":
+                    record["task"] = Task(record["task"])
+                elif record["op"] == "set":
+                    record["tasks"] = [Task(task) for task in record["tasks"]]
+                apply_record(tasks, record, by_id)
+        self._open()
+        return tasks
+
+    def append(self, record, tasks):
+        """Append one mutation record; compaction kicks in past the size threshold."""
+        self.append_many([record], tasks)
+
+    def append_many(self, records, tasks):
+        """Append several records with a single write."""
+        line = "".join(json.dumps(record, default=as_dict) + "\n" for record in records).encode("utf-8")
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line)
+            if self._size < self.compact_bytes or self._worker is not None:
+                return
+            # Copy the rows now; serialization and disk writes happen off-thread
+            snapshot = [as_dict(task) for task in tasks]
+            self._worker = threading.Thread(
+                target=self._compact, args=(snapshot, self._size), daemon=True
+            )
+            self._worker.start()
+
+    def compact(self, tasks):
+        """Fold the journal into a fresh snapshot of tasks right away."""
+        self._join()
+        with self._lock:
+            offset = self._size
+        self._compact([as_dict(task) for task in tasks], offset)
+
+    def close(self, tasks):
+        """Compact any outstanding records and close the journal file."""
+        self._join()
+        if self._size > self._header_size:
+            self.compact(tasks)
+        with self._lock:
+            self._file.close()
+            self._file = None
+
+    def _join(self):
+        worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def _compact(self, snapshot, offset):
+        # Write the new snapshot aside, then swap snapshot and journal under the lock.
+        # Records appended after `offset` were not part of the snapshot and carry over.
+        try:
+            data = encode_snapshot(snapshot)
+            snapshot_tmp = self.snapshot_path + ".tmp"
+            with open(snapshot_tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            with self._lock:
+                self._file.flush()
+                with open(self.path, "rb") as f:
+                    f.seek(offset)
+                    tail = f.read()
+                self._write_journal(self.pending_path, _digest(data), tail)
+                os.replace(snapshot_tmp, self.snapshot_path)
+                os.replace(self.pending_path, self.path)
+                self._file.close()
+                self._open()
+        except OSError:
+            # The old snapshot and journal are still consistent; retry on the next threshold
+            pass
+        finally:
+            self._worker = None
+
+    def _recover(self, base):
+        # Finish or discard a compaction interrupted between the two renames
+        if not os.path.exists(self.pending_path):
+            return
+        if self._read_header(self.pending_path) == base:
+            os.replace(self.pending_path, self.path)
+        else:
+            os.remove(self.pending_path)
+
+    def _read_header(self, path):
+        with open(path, "rb") as f:
+            try:
+                return json.loads(f.readline()).get("base")
+            except ValueError:
+                return None
+
+    def _read_records(self, base):
+        # Return the records that apply on top of `base`, or None if there are none
+        if not os.path.exists(self.path) or self._read_header(self.path) != base:
+            return None
+        records = []
+        with open(self.path, "rb") as f:
+            valid = len(f.readline())
+            for line in f:
+                try:
+                    record = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    record = None
+                if record is None:
+                    # A torn final write from a crash; drop it so appends start clean
+                    os.truncate(self.path, valid)
+                    break
+                records.append(record)
+                valid += len(line)
+        return records
+
+    def _start_journal(self, base, tail):
+        self._write_journal(self.pending_path, base, tail)
+        os.replace(self.pending_path, self.path)
+
+    def _write_journal(self, path, base, tail):
+        header = (json.dumps({"base": base}) + "\n").encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(header + tail)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        with open(self.path, "rb") as f:
+            self._header_size = len(f.readline())
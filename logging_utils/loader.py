@@ -0,0 +1,46 @@
+import queue
+import threading
+from logging_utils.task import Task
+
+# Tasks per chunk handed from the loading thread
+LOAD_CHUNK = 1000
+
+
+class BackgroundLoader:
+    """
+    Reads a storage backend's tasks on a worker thread, in chunks.
+
+    The thread only parses and packs the tasks into Task objects; chunks
+    are applied to the task list by whoever calls TaskManager.poll_load
+    (the Tk thread in the app), so the list is never changed from two
+    threads.
+    """
+
+    def __init__(self, storage, chunk_size=LOAD_CHUNK):
+        self.queue = queue.Queue()
+        self.done = False
+        self.thread = threading.Thread(target=self._run, args=(storage, chunk_size),
+                                       name="task-loader", daemon=True)
+        self.thread.start()
+
+    def _run(self, storage, chunk_size):
+        try:
+            for chunk in storage.load_chunks(chunk_size):
+                self.queue.put([Task(task) for task in chunk])
+        except Exception as e:
+            self.queue.put(e)
+        self.queue.put(None)
+
+    def take(self, block=False):
+        """The next chunk, [] if none is ready yet, or None once every chunk was taken."""
+        if self.done:
+            return None
+        try:
+            item = self.queue.get(block)
+        except queue.Empty:
+            return []
+        if item is None or isinstance(item, Exception):
+            self.done = True
+            if item is not None:
+                raise item
+        return item
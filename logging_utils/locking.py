@@ -0,0 +1,47 @@
+"""
+Advisory locks and change tokens for a task file shared by several app instances.
+
+Two windows, the CLI and the daemon may all have the same todo_tasks.json
+open. Writers hold an exclusive flock on a sidecar "<file>.lock" while they
+check the file's version and replace it; the lock cannot live on the data
+file itself because every save swaps in a new inode.
+"""
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves stay atomic, but are not serialized between instances
+    fcntl = None
+
+
+class ConflictError(Exception):
+    """The store was changed by another instance since this one last read or wrote it."""
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive advisory lock for path for the duration of the block."""
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def file_version(target):
+    """
+    A token that changes whenever a file is replaced or rewritten, or None if it is missing.
+
+    target is a path or an open file descriptor; (inode, mtime, size) is
+    compared instead of the contents so polling it stays a single stat().
+    """
+    try:
+        st = os.stat(target)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
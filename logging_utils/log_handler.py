@@ -1,74 +1,769 @@
 import os
 import json
+import threading
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from datetime import datetime
+from logging_utils.storage import JsonStorage, JournalStorage, query_tasks
+from logging_utils.sqlite_storage import SqliteStorage
+from logging_utils.writer import SAVE_WINDOW
+from logging_utils.due_index import DueIndex
+from logging_utils.search_index import SearchIndex, parse_query
+from logging_utils.sort_index import SortIndex, SortedView, sort_key
+from logging_utils.history import UNDO_BUDGET, History
+from logging_utils.archive import ARCHIVE_AGE_DAYS, TIMESTAMP_FORMAT, Archive, archivable, stamp_completed
+from logging_utils.loader import BackgroundLoader
+from logging_utils.locking import ConflictError
+from logging_utils.task import Task, to_task
+from logging_utils.profiler import profiled
+from logging_utils.records import (
+    MAX_RANK_LEN, apply_record, assign_ranks, index_of, new_id, normalize_tasks, rank_between, rank_key,
+    ranks_between
+)
 
 LOG_DIR = os.path.join(os.path.dirname(__file__), "logs")
 LOG_FILE = os.path.join(LOG_DIR, "todo_tasks.json")
+DB_FILE = os.path.join(LOG_DIR, "todo_tasks.db")
 CFG_FILE = os.path.join(LOG_DIR, "window_cfg.json")
+PROFILE_LOG = os.path.join(LOG_DIR, "profile.log")
+
+# TODO_STORAGE selects the backend: "json" (default), "journal" or "sqlite".
+# TODO_JOURNAL=1 is kept as a shorthand for TODO_STORAGE=journal.
+STORAGE = os.environ.get("TODO_STORAGE", "journal" if os.environ.get("TODO_JOURNAL") == "1" else "json")
+# Set TODO_ASYNC_SAVE=1 to write JSON snapshots from a background thread;
+# TODO_SAVE_WINDOW_MS controls how long bursts of changes are coalesced
+ASYNC_SAVE = os.environ.get("TODO_ASYNC_SAVE") == "1"
+ASYNC_SAVE_WINDOW = int(os.environ.get("TODO_SAVE_WINDOW_MS", SAVE_WINDOW * 1000)) / 1000
+# Memory budget of the undo/redo history, in KiB
+UNDO_BUDGET_KB = int(os.environ.get("TODO_UNDO_BUDGET_KB", UNDO_BUDGET // 1024))
+# Completed tasks older than TODO_ARCHIVE_DAYS move to the archive file; 0 keeps them
+ARCHIVE_DAYS = int(os.environ.get("TODO_ARCHIVE_DAYS", ARCHIVE_AGE_DAYS))
+# Set TODO_PROFILE=1 (or run main.py --profile) to record timings in PROFILE_LOG
+PROFILE = os.environ.get("TODO_PROFILE") == "1"
+# Base-version marker for tasks without unsaved changes
+_UNCHANGED = object()
 
 def ensure_log_dir():
     if not os.path.exists(LOG_DIR):
         os.makedirs(LOG_DIR)
 
+def make_storage(kind=None, path=None):
+    # Build a storage backend by name; the JSON path is also the sqlite migration source
+    kind = kind or STORAGE
+    path = path or LOG_FILE
+    if kind == "journal":
+        return JournalStorage(path)
+    if kind == "sqlite":
+        db_path = DB_FILE if path == LOG_FILE else os.path.splitext(path)[0] + ".db"
+        return SqliteStorage(db_path, json_path=path)
+    return JsonStorage(path, async_save=ASYNC_SAVE, save_window=ASYNC_SAVE_WINDOW)
+
+def _diff(ours, theirs, base):
+    # Fields that make ours look like theirs, leaving out those ours changed since base
+    fields = {}
+    for key in {**ours, **theirs}:
+        value = theirs.get(key)
+        if ours.get(key) != value and ours.get(key) == base.get(key):
+            fields[key] = value
+    return fields
+
+def archive_path(path):
+    # Archive file kept next to a task file, e.g. todo_tasks_archive.jsonl.gz
+    return os.path.splitext(path)[0] + "_archive.jsonl.gz"
+
 class TaskManager:
-    def __init__(self):
+    def __init__(self, path=None, storage=None, background=False):
+        # With background, tasks are parsed on a worker thread and arrive
+        # through poll_load(); changes made meanwhile wait for the rest
         ensure_log_dir()
-        self.tasks = self.read_tasks()
+        self.path = path or LOG_FILE
+        # Held while the task list changes so background writers see consistent snapshots
+        self.lock = threading.RLock()
+        if storage is None or isinstance(storage, str):
+            storage = make_storage(storage, self.path)
+        self.storage = storage
+        self.storage.attach(self)
+        self.due_index = DueIndex()
+        self._search_index = None  # Built by the first search
+        self.sort_index = SortIndex()
+        self.loader = None
+        self._load_fixups = False  # Loaded tasks that need ids or ranks assigned
+        # Task id -> the task as last stored (None: not stored yet), for every
+        # task changed here since; how merges tell our changes from theirs
+        self._base = {}
+        self._external = []  # Records merged from other instances, not yet reported by sync()
+        self.conflicts = 0  # Tasks changed both here and elsewhere, kept with our fields winning
+        if background and self.storage.background_load:
+            self.tasks = []
+            self.by_id = {}
+            self.loader = BackgroundLoader(self.storage)
+        else:
+            self.tasks = self.read_tasks()
+            self.by_id = {task["id"]: task for task in self.tasks}
+            self.due_index.rebuild(self.tasks)
+        self.history = History(UNDO_BUDGET_KB * 1024)
+        self.archive = Archive(archive_path(self.path))  # Read only when searched or shown
+        self._pending = None  # Records held back by an open batch()
+        self._pending_save = False
         self.last_deleted = None
 
+    @profiled("manager.read_tasks")
     def read_tasks(self):
-        if not os.path.exists(LOG_FILE):
-            return []
-        with open(LOG_FILE, "r") as f:
+        tasks = [to_task(task) for task in self.storage.load()]
+        # Files written before tasks had ids, ranks and completion times get them once
+        changed = normalize_tasks(tasks)
+        if stamp_completed(tasks) or changed:
             try:
-                return json.load(f)
-            except Exception:
-                return []
+                self.storage.save(tasks)
+            except ConflictError:
+                pass  # Another instance saved in the meantime; ours goes out with the next change
+        return tasks
+
+    @property
+    def loading(self):
+        return self.loader is not None
+
+    @property
+    def search_index(self):
+        # Indexing every description is the bulk of a load, so it waits for a
+        # search; sessions and CLI commands that never search skip it
+        if self._search_index is None:
+            self._search_index = SearchIndex()
+            self._search_index.rebuild(self.tasks)
+        return self._search_index
+
+    @profiled("manager.poll_load")
+    def poll_load(self, limit=None, block=False):
+        # Append the tasks parsed so far, about limit at most; returns how
+        # many were added. With block, waits for the loader to finish.
+        added = 0
+        while self.loader is not None and (limit is None or added < limit):
+            chunk = self.loader.take(block)
+            if chunk is None:
+                self._finish_load()
+            elif not chunk:
+                break
+            else:
+                self._append_loaded(chunk)
+                added += len(chunk)
+        return added
+
+    def wait_loaded(self):
+        # Take in every remaining task; changes to a half-loaded list would misplace ranks
+        if self.loader is not None:
+            self.poll_load(block=True)
 
+    def _append_loaded(self, chunk):
+        with self.lock:
+            last = self.tasks[-1]["rank"] if self.tasks else None
+            now = datetime.now()
+            for task in chunk:
+                if "id" not in task:
+                    task["id"] = new_id()
+                    self._load_fixups = True
+                # Keep the list sorted by rank while it loads; real ranks are assigned at the end
+                rank = task.get("rank")
+                if rank is None or (last is not None and rank <= last):
+                    task["rank"] = rank_between(last)
+                    self._load_fixups = True
+                last = task["rank"]
+                self.tasks.append(task)
+                self.by_id[task["id"]] = task
+                self.due_index.add(task, now)
+                if self._search_index is not None:
+                    self._search_index.add(task)
+                self.sort_index.add(task)
+
+    def _finish_load(self):
+        self.loader = None
+        stamped = stamp_completed(self.tasks)
+        if self._load_fixups or stamped:
+            # Files written before tasks had ids, ranks and completion times get them once
+            with self.lock:
+                self._note_base(self.by_id)
+                if self._load_fixups:
+                    assign_ranks(self.tasks)
+                    self.sort_index.rebuild(self.tasks)
+                self._store(self.storage.save, self.tasks)
+            self._load_fixups = False
+
+    @profiled("manager.save_tasks")
     def save_tasks(self):
-        with open(LOG_FILE, "w") as f:
-            json.dump(self.tasks, f, indent=2)
+        # Persist the whole list (JSON rewrite, journal compaction or table rewrite)
+        self.wait_loaded()
+        if self._pending is not None:
+            self._pending_save = True
+            return
+        self._store(self.storage.save, self.tasks)
+
+    def snapshot(self, take_base=False):
+        # Copy the task rows so they can be serialized off the main thread.
+        # With take_base the record of unsaved changes goes along, as writing
+        # the rows saves them, and (rows, base) is returned
+        with self.lock:
+            rows = [task.to_dict() for task in self.tasks]
+            if not take_base:
+                return rows
+            base, self._base = self._base, {}
+            return rows, base
+
+    def restore_base(self, base):
+        # Writing a snapshot failed: its changes count as unsaved again
+        with self.lock:
+            self._base.update(base)
+
+    @profiled("manager.flush")
+    def flush(self):
+        # Block until every change so far is persisted
+        self._store(self.storage.flush)
+
+    def _store(self, write, *args):
+        # Run a storage write. When another instance saved first it is
+        # refused; merge what that instance saved and write the merged list
+        while True:
+            try:
+                write(*args)
+                break
+            except ConflictError:
+                self._pull(save=False)
+                write, args = self._save_merged, ()
+        if not self.storage.writes_in_background:
+            self._base.clear()
+
+    def _save_merged(self):
+        self.storage.save(self.tasks)
+        self.storage.flush()
+
+    @profiled("manager.sync")
+    def sync(self):
+        # Take in what other instances saved since this one last read or
+        # wrote the store. Returns the records applied here, including any
+        # merged while a save of ours was refused, so views can repaint them
+        if self.loader is None and self._pending is None and self.storage.changed():
+            self._pull()
+        records, self._external = self._external, []
+        return records
+
+    def _pull(self, save=True):
+        # Re-read the store and merge it into the list. Rank ties the merge
+        # created are broken as changes of our own, saved here unless the
+        # caller writes the merged list anyway
+        with self.lock:
+            records = self._merge(self.storage.reload())
+            fixes = self._spread_ranks(records)
+            self._external.extend(records + fixes)
+            if fixes and save:
+                self._store(self.storage.commit_many, fixes, self.tasks)
+
+    def _spread_ranks(self, records):
+        # Merged tasks can share a rank with ours, e.g. when two instances
+        # appended at once, and no rank fits between equal ones. The smallest
+        # id keeps the rank and the others move just after it, so every
+        # instance breaks the tie the same way; returns the update records
+        fixes = []
+        for record in records:
+            if record["op"] == "add":
+                task = record["task"]
+            elif record["op"] == "update" and "rank" in record["fields"]:
+                task = self.by_id.get(record["id"])
+            else:
+                continue
+            if task is None or self.by_id.get(task["id"]) is not task:
+                continue
+            rank = task["rank"]
+            lo = bisect_left(self.tasks, rank, key=rank_key)
+            hi = bisect_right(self.tasks, rank, key=rank_key)
+            if hi - lo < 2:
+                continue
+            tied = sorted(self.tasks[lo:hi], key=lambda t: t["id"])[1:]
+            after = self.tasks[hi]["rank"] if hi < len(self.tasks) else None
+            for other, new_rank in zip(tied, ranks_between(rank, after, len(tied))):
+                fix = {"op": "update", "id": other["id"], "fields": {"rank": new_rank}}
+                self._note_base((other["id"],))
+                apply_record(self.tasks, fix, self.by_id)
+                self._reindex(fix)
+                fixes.append(fix)
+        return fixes
+
+    def _merge(self, stored):
+        # Three-way merge of the stored tasks into ours. Tasks changed only
+        # there take the stored version, tasks changed only here keep ours,
+        # and for a task changed on both sides each field goes to the side
+        # that changed it, ours if both did. Returns the records applied;
+        # nothing is persisted or added to the undo history.
+        if stored is None:
+            return []
+        # Compared as on-disk dicts; only added tasks become Task objects
+        theirs = {task["id"]: task for task in stored if isinstance(task, dict) and "id" in task}
+        deletes, updates, adds = [], [], []
+        for task_id, task in self.by_id.items():
+            base = self._base.get(task_id, _UNCHANGED)
+            other = theirs.get(task_id)
+            if other is None:
+                if base is _UNCHANGED:
+                    deletes.append({"op": "delete", "id": task_id})
+                elif base is not None:
+                    self.conflicts += 1  # Deleted there, changed here: keep it
+                continue
+            if base is _UNCHANGED:
+                ours = task.to_dict()
+                if ours == other:
+                    continue
+                base = ours
+            elif base is None or other == base:
+                continue
+            else:
+                self.conflicts += 1
+            fields = _diff(task.to_dict(), other, base)
+            if fields:
+                updates.append({"op": "update", "id": task_id, "fields": fields})
+        for task_id, task in theirs.items():
+            # Added there; or deleted here, which wins over changes made there
+            if task_id not in self.by_id:
+                base = self._base.get(task_id, _UNCHANGED)
+                if base is _UNCHANGED:
+                    adds.append({"op": "add", "task": to_task(task)})
+                elif task != base:
+                    self.conflicts += 1
+        records = deletes + updates + adds
+        for record in records:
+            apply_record(self.tasks, record, self.by_id)
+            self._reindex(record)
+        # Our unsaved changes are now relative to the version just read
+        self._base = {task_id: theirs.get(task_id) for task_id in self._base}
+        if deletes or adds:
+            # Undo steps address list positions that have shifted
+            self.history.clear()
+            self.last_deleted = None
+        return records
+
+    def _note_base(self, task_ids):
+        # Remember how tasks were stored before their first unsaved change
+        for task_id in task_ids:
+            if task_id not in self._base:
+                task = self.by_id.get(task_id)
+                self._base[task_id] = task.to_dict() if task is not None else None
+
+    def query(self, completed=None, overdue=None, priority=None, order_by=None, now=None):
+        # Filter tasks in the backend when it can, otherwise in memory.
+        # order_by is "priority" (High first) or "due_date"; None keeps list order.
+        result = self.storage.query(completed=completed, overdue=overdue, priority=priority,
+                                    order_by=order_by, now=now)
+        if result is None:
+            result = query_tasks(self.tasks, completed=completed, overdue=overdue, priority=priority,
+                                 order_by=order_by, now=now)
+        return result
+
+    def search(self, text, order=None, descending=False):
+        # Tasks matching a search string, or None when it has no words or
+        # facets. Words match as prefixes; "is:done", "is:open", "is:overdue"
+        # and "p:<priority>" narrow the result, and "is:archived" searches the
+        # archive instead. Hits come in list order, or in a SORT_KEYS order
+        # when one is given.
+        terms, status, priorities = parse_query(text)
+        if "archived" in status:
+            return self.search_archive(terms, status, priorities, order, descending)
+        ids = self.search_index.match(terms, status, priorities, overdue=self.due_index.overdue)
+        if ids is None:
+            return None
+        key = rank_key if order is None else (lambda task: sort_key(order, task))
+        return sorted((self.by_id[task_id] for task_id in ids), key=key, reverse=descending)
+
+    def search_archive(self, terms=(), status=(), priorities=(), order=None, descending=False):
+        # Archived tasks matching parsed query words and facets, in archive
+        # order or a SORT_KEYS order. Without words the whole archive is
+        # loaded once and kept; a word search streams it from disk.
+        if not terms:
+            self.archive.load()
+        hits = list(self.archive.search(terms, status, priorities))
+        if order is not None:
+            hits.sort(key=lambda task: sort_key(order, task), reverse=descending)
+        elif descending:
+            hits.reverse()
+        return hits
+
+    @profiled("manager.archive")
+    def archive_completed(self, max_age_days=None, now=None):
+        # Move completed tasks older than max_age_days (ARCHIVE_DAYS by
+        # default) to the archive; returns how many were moved. The archive
+        # is written and synced before the tasks leave the list, and the
+        # move cannot be undone, so the undo history starts over.
+        days = ARCHIVE_DAYS if max_age_days is None else max_age_days
+        self.wait_loaded()
+        with self.lock:
+            tasks = archivable(self.tasks, days, now)
+            if not tasks:
+                return 0
+            self.archive.append(tasks)
+            with self.history.paused(), self.batch():
+                for task in tasks:
+                    self._commit({"op": "delete", "id": task["id"]})
+            self.history.clear()
+            return len(tasks)
+
+    def restore_archived(self, task_ids, now=None):
+        # Move archived tasks back to the end of the list; returns the ids
+        # restored. Done ones count as finished now, so archiving keeps them
+        # for another ARCHIVE_DAYS. The tasks are saved to the list before
+        # they leave the archive, and like archiving this is not undoable.
+        self.wait_loaded()
+        wanted = set(task_ids) - self.by_id.keys()
+        with self.lock:
+            tasks = [task.copy() for task in self.archive.load() if task.id in wanted]
+            if not tasks:
+                return []
+            stamp = (now or datetime.now()).strftime(TIMESTAMP_FORMAT)
+            rank = self.tasks[-1].rank if self.tasks else None
+            with self.history.paused(), self.batch():
+                for task in tasks:
+                    task["rank"] = rank = rank_between(rank)
+                    if task.completed:
+                        task["completed_at"] = stamp
+                    self._commit({"op": "add", "task": task})
+            self._check_rank(rank)
+            self.archive.remove(task.id for task in tasks)
+            self.history.clear()
+            return [task.id for task in tasks]
+
+    def sorted_view(self, order, descending=False):
+        # The task list in a SORT_KEYS order ("priority", "due_date",
+        # "timestamp", "desc" or "status"), kept sorted as tasks change
+        return SortedView(self, order, descending)
+
+    @profiled("manager.commit")
+    def _commit(self, record):
+        # Apply a mutation record in memory and persist just that change
+        with self.lock:
+            self._note_base((record["task"].id if record["op"] == "add" else record["id"],))
+            apply_record(self.tasks, record, self.by_id)
+            self._reindex(record)
+            if self._pending is not None:
+                self._pending.append(record)
+            else:
+                self._store(self.storage.commit, record, self.tasks)
+
+    @contextmanager
+    def batch(self):
+        # Apply any number of changes, persist them once on exit and undo them as one step
+        self.wait_loaded()
+        with self.lock, self.history.group():
+            if self._pending is not None:
+                yield
+                return
+            self._pending = []
+            try:
+                yield
+            finally:
+                records, self._pending = self._pending, None
+                save, self._pending_save = self._pending_save, False
+                if save:
+                    self._store(self.storage.save, self.tasks)
+                elif records:
+                    self._store(self.storage.commit_many, records, self.tasks)
+
+    def _reindex(self, record):
+        # Keep derived indexes in step with a record that was just applied
+        op = record["op"]
+        search_index = self._search_index
+        if op == "add":
+            self.due_index.add(record["task"])
+            if search_index is not None:
+                search_index.add(record["task"])
+            self.sort_index.add(record["task"])
+        elif op == "delete":
+            self.due_index.remove(record["id"])
+            if search_index is not None:
+                search_index.remove(record["id"])
+            self.sort_index.remove(record["id"])
+        elif op == "update":
+            fields = record["fields"]
+            if "due_date" in fields or "completed" in fields:
+                self.due_index.add(self.by_id[record["id"]])
+            if search_index is not None and ("desc" in fields or "priority" in fields or "completed" in fields):
+                search_index.add(self.by_id[record["id"]])
+            self.sort_index.add(self.by_id[record["id"]])
+        elif op == "set":
+            self.due_index.rebuild(self.tasks)
+            self._search_index = None
+            self.sort_index.rebuild(self.tasks)
+
+    def is_overdue(self, task):
+        return self.due_index.is_overdue(task["id"])
+
+    def next_due_time(self):
+        # When the next incomplete task becomes overdue, or None
+        return self.due_index.next_due()
+
+    def refresh_overdue(self, now=None):
+        # Flag tasks whose due date has passed; returns the ids that became overdue
+        return self.due_index.refresh(now)
+
+    def get_task(self, task_id):
+        return self.by_id.get(task_id)
+
+    def index_of(self, task_id):
+        # Current list position of a task, by binary search on its rank
+        return index_of(self.tasks, self.by_id[task_id])
+
+    def _check_rank(self, rank):
+        # Spread ranks out again once inserts into one gap have made them long
+        if len(rank) > MAX_RANK_LEN:
+            with self.lock:
+                self._note_base(self.by_id)
+                assign_ranks(self.tasks)
+                self.sort_index.rebuild(self.tasks)
+                self.save_tasks()
 
     def add_task(self, desc, timestamp, priority, due_date):
-        self.tasks.append({
+        self.wait_loaded()
+        task = Task({
+            "id": new_id(),
+            "rank": rank_between(self.tasks[-1].rank if self.tasks else None),
             "desc": desc,
             "timestamp": timestamp,
             "completed": False,
             "priority": priority,
             "due_date": due_date
         })
-        self.save_tasks()
+        self._commit({"op": "add", "task": task})
+        self._check_rank(task.rank)
+        self.history.record({"op": "add", "task": task, "index": len(self.tasks) - 1})
+        return task.id
 
-    def delete_task(self, index):
-        if 0 <= index < len(self.tasks):
-            self.last_deleted = (index, self.tasks[index])
-            del self.tasks[index]
-            self.save_tasks()
+    def _insert_at(self, task, index):
+        # Put a task back at a list position, ranked between its new neighbours
+        before = self.tasks[index - 1]["rank"] if index > 0 else None
+        after = self.tasks[index]["rank"] if index < len(self.tasks) else None
+        task["rank"] = rank_between(before, after)
+        self._commit({"op": "add", "task": task})
+        self._check_rank(task["rank"])
+
+    def delete_task_by_id(self, task_id):
+        self.wait_loaded()
+        if task_id in self.by_id:
+            task = self.last_deleted = self.by_id[task_id]
+            index = self.index_of(task_id)
+            self._commit({"op": "delete", "id": task_id})
+            self.history.record({"op": "delete", "task": task, "index": index})
 
     def undo_delete(self):
+        # The deleted task still carries its rank, so it goes back where it was
+        self.wait_loaded()
         if self.last_deleted:
-            idx, task = self.last_deleted
-            self.tasks.insert(idx, task)
-            self.save_tasks()
+            task = self.last_deleted
             self.last_deleted = None
+            # A task added since may have taken the same rank; slot in just before it
+            idx = bisect_left(self.tasks, task["rank"], key=rank_key)
+            if idx < len(self.tasks) and self.tasks[idx]["rank"] == task["rank"]:
+                before = self.tasks[idx - 1]["rank"] if idx > 0 else None
+                task["rank"] = rank_between(before, task["rank"])
+            self._commit({"op": "add", "task": task})
+            self._check_rank(task["rank"])
+            self.history.record({"op": "add", "task": task, "index": self.index_of(task["id"])})
 
-    def update_task(self, index, desc=None, priority=None, due_date=None):
-        if 0 <= index < len(self.tasks):
+    def update_task_by_id(self, task_id, desc=None, priority=None, due_date=None):
+        if task_id in self.by_id:
+            fields = {}
             if desc is not None:
-                self.tasks[index]["desc"] = desc
+                fields["desc"] = desc
             if priority is not None:
-                self.tasks[index]["priority"] = priority
+                fields["priority"] = priority
             if due_date is not None:
-                self.tasks[index]["due_date"] = due_date
-            self.save_tasks()
+                fields["due_date"] = due_date
+            self._update(task_id, fields)
+
+    def toggle_complete_by_id(self, task_id):
+        if task_id in self.by_id:
+            completed = not self.by_id[task_id].get("completed", False)
+            self._update(task_id, self._completion(completed))
+
+    def _completion(self, completed):
+        # Fields for a completion change; the time done is what archiving goes by
+        return {"completed": completed,
+                "completed_at": datetime.now().strftime(TIMESTAMP_FORMAT) if completed else ""}
+
+    def _update(self, task_id, fields):
+        # Change task fields, logging their old values for undo
+        self.wait_loaded()
+        task = self.by_id[task_id]
+        before = {name: task.get(name) for name in fields}
+        self._commit({"op": "update", "id": task_id, "fields": fields})
+        if before != fields:
+            self.history.record({"op": "update", "id": task_id, "before": before, "after": dict(fields)})
+
+    def move_task_by_id(self, task_id, new_index):
+        # Reordering only gives the task a new rank between its new neighbours
+        self.wait_loaded()
+        if task_id not in self.by_id or not 0 <= new_index < len(self.tasks):
+            return
+        old_index = self.index_of(task_id)
+        if new_index == old_index:
+            return
+
+        # Neighbours of the target slot once the task is taken out of the list
+        def neighbour(idx):
+            return self.tasks[idx if idx < old_index else idx + 1]["rank"]
+
+        before = neighbour(new_index - 1) if new_index > 0 else None
+        after = neighbour(new_index) if new_index < len(self.tasks) - 1 else None
+        rank = rank_between(before, after)
+        self._commit({"op": "update", "id": task_id, "fields": {"rank": rank}})
+        self._check_rank(rank)
+        self.history.record({"op": "move", "id": task_id, "from": old_index, "to": new_index})
+
+    def undo_group(self):
+        # Context manager: changes made inside it undo and redo as one step
+        return self.history.group()
+
+    def undo(self):
+        # Revert the newest history entry; False if there is nothing to undo
+        self.wait_loaded()
+        deltas = self.history.pop_undo()
+        if deltas is None:
+            return False
+        with self.history.paused(), self.batch():
+            for delta in reversed(deltas):
+                self._revert(delta)
+        return True
+
+    def redo(self):
+        # Re-apply the last undone entry; False if there is nothing to redo
+        self.wait_loaded()
+        deltas = self.history.pop_redo()
+        if deltas is None:
+            return False
+        with self.history.paused(), self.batch():
+            for delta in deltas:
+                self._replay(delta)
+        return True
+
+    def _revert(self, delta):
+        op = delta["op"]
+        if op == "add":
+            self._commit({"op": "delete", "id": delta["task"]["id"]})
+        elif op == "delete":
+            if self.last_deleted is delta["task"]:
+                self.last_deleted = None
+            self._insert_at(delta["task"], delta["index"])
+        elif op == "update":
+            self._commit({"op": "update", "id": delta["id"], "fields": dict(delta["before"])})
+        elif op == "move":
+            self.move_task_by_id(delta["id"], delta["from"])
+        elif op == "reorder":
+            self._reorder(delta["before"])
+
+    def _replay(self, delta):
+        op = delta["op"]
+        if op == "add":
+            self._insert_at(delta["task"], delta["index"])
+        elif op == "delete":
+            self._commit({"op": "delete", "id": delta["task"]["id"]})
+        elif op == "update":
+            self._commit({"op": "update", "id": delta["id"], "fields": dict(delta["after"])})
+        elif op == "move":
+            self.move_task_by_id(delta["id"], delta["to"])
+        elif op == "reorder":
+            self._reorder(delta["after"])
+
+    def _reorder(self, ids):
+        self.set_tasks([self.by_id[task_id] for task_id in ids])
+
+    # Bulk API: many tasks per call, persisted once
+
+    def bulk_add(self, items):
+        # Add tasks from dicts with desc, timestamp, priority and due_date; returns their ids
+        with self.batch():
+            return [self.add_task(item["desc"], item["timestamp"], item["priority"], item["due_date"])
+                    for item in items]
+
+    def bulk_update(self, task_ids, desc=None, priority=None, due_date=None):
+        with self.batch():
+            for task_id in task_ids:
+                self.update_task_by_id(task_id, desc=desc, priority=priority, due_date=due_date)
+
+    def bulk_delete(self, task_ids):
+        with self.batch():
+            for task_id in task_ids:
+                self.delete_task_by_id(task_id)
+
+    def bulk_toggle(self, task_ids, completed=None):
+        # Flip each task, or set them all to `completed` when it is given
+        with self.batch():
+            for task_id in task_ids:
+                if task_id not in self.by_id:
+                    continue
+                if completed is None:
+                    self.toggle_complete_by_id(task_id)
+                else:
+                    self._update(task_id, self._completion(completed))
+
+    def bulk_move(self, task_ids, new_index):
+        # Move tasks, keeping their current order, to a block starting at new_index
+        with self.batch():
+            moving = sorted({task_id for task_id in task_ids if task_id in self.by_id}, key=self.index_of)
+            if not moving:
+                return
+            moving_set = set(moving)
+            rest = [task for task in self.tasks if task["id"] not in moving_set]
+            new_index = max(0, min(new_index, len(rest)))
+            before = rest[new_index - 1]["rank"] if new_index > 0 else None
+            after = rest[new_index]["rank"] if new_index < len(rest) else None
+            ranks = ranks_between(before, after, len(moving))
+            for task_id, rank in zip(moving, ranks):
+                old_index = self.index_of(task_id)
+                self._commit({"op": "update", "id": task_id, "fields": {"rank": rank}})
+                new_pos = self.index_of(task_id)
+                if new_pos != old_index:
+                    self.history.record({"op": "move", "id": task_id, "from": old_index, "to": new_pos})
+            self._check_rank(max(ranks, key=len))
+
+    # Index-based API used by the UI; each resolves the id and delegates
+
+    def delete_task(self, index):
+        if 0 <= index < len(self.tasks):
+            self.delete_task_by_id(self.tasks[index]["id"])
+
+    def update_task(self, index, desc=None, priority=None, due_date=None):
+        if 0 <= index < len(self.tasks):
+            self.update_task_by_id(self.tasks[index]["id"], desc=desc, priority=priority, due_date=due_date)
 
     def toggle_complete(self, index):
         if 0 <= index < len(self.tasks):
-            self.tasks[index]["completed"] = not self.tasks[index].get("completed", False)
-            self.save_tasks()
+            self.toggle_complete_by_id(self.tasks[index]["id"])
+
+    def move_task(self, index, new_index):
+        if 0 <= index < len(self.tasks):
+            self.move_task_by_id(self.tasks[index]["id"], new_index)
 
     def set_tasks(self, tasks):
-        self.tasks = tasks
-        self.save_tasks()
+        # Replace the whole list; ranks follow the given order
+        self.wait_loaded()
+        with self.lock:
+            before = [task["id"] for task in self.tasks]
+            tasks = [to_task(task) for task in tasks]
+            normalize_tasks(tasks)
+            self._note_base(self.by_id)
+            self._note_base(task["id"] for task in tasks)
+            assign_ranks(tasks)
+            self.tasks = tasks
+            self.by_id = {task["id"]: task for task in tasks}
+            self.due_index.rebuild(tasks)
+            self._search_index = None
+            self.sort_index.rebuild(tasks)
+            self.save_tasks()
+            # A reordering of the same tasks is undoable; anything else starts a new history
+            after = [task["id"] for task in tasks]
+            if before != after and set(before) == set(after):
+                self.history.record({"op": "reorder", "before": before, "after": after})
+            elif set(before) != set(after):
+                self.history.clear()
+
+    @profiled("manager.close")
+    def close(self):
+        # Persist anything outstanding and release the backend
+        self.wait_loaded()
+        self._store(self.storage.flush)
+        self.storage.close(self.tasks)
 
     def save_window_cfg(self, geometry):
         with open(CFG_FILE, "w") as f:
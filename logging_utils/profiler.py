@@ -0,0 +1,146 @@
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# Rolling stats file size and how many old files to keep
+PROFILE_LOG_BYTES = 1024 * 1024
+PROFILE_LOG_BACKUPS = 3
+# How often the collected stats are written out while the app runs
+FLUSH_INTERVAL_MS = 30000
+
+
+class Profiler:
+    """
+    Opt-in timings and call counts for hot paths, written to a rolling log.
+
+    Disabled, a profiled call costs one attribute check. Enabled, every
+    profiled name accumulates calls, total and worst time; flush() appends
+    them as one JSON line and starts a new interval. Key and mouse events
+    are timed from the event's own timestamp to the end of their handling.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.stats = {}  # name -> [calls, total seconds, max seconds]
+        self.logger = None
+        self.log_path = None
+        self.capture = None  # Running cProfile.Profile, if any
+        self._clock_offset = None  # Smallest (wall ms - event.time) seen
+
+    def enable(self, log_path):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.log_path = log_path
+        self.logger = logging.getLogger("todo.profile")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        handler = RotatingFileHandler(log_path, maxBytes=PROFILE_LOG_BYTES, backupCount=PROFILE_LOG_BACKUPS)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(handler)
+
+    def add(self, name, elapsed):
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, elapsed, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+
+    @contextmanager
+    def timer(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def report(self):
+        """Current interval's stats as {name: {calls, total_ms, mean_ms, max_ms}}."""
+        return {
+            name: {
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total * 1000 / calls, 3),
+                "max_ms": round(worst * 1000, 3),
+            }
+            for name, (calls, total, worst) in sorted(self.stats.items())
+        }
+
+    def flush(self):
+        """Write the current interval to the log and start a new one."""
+        if self.enabled and self.stats:
+            self.logger.info(json.dumps({"time": datetime.now().isoformat(timespec="seconds"),
+                                         "stats": self.report()}))
+            self.stats = {}
+
+    def watch_events(self, root):
+        """Time key and button events on root and flush the stats periodically."""
+        if not self.enabled:
+            return
+        # "all" bindings run after the widget and window ones, i.e. once the event is handled
+        root.bind_all("<KeyPress>", self._on_event, add="+")
+        root.bind_all("<ButtonPress>", self._on_event, add="+")
+
+        def periodic():
+            self.flush()
+            root.after(FLUSH_INTERVAL_MS, periodic)
+        root.after(FLUSH_INTERVAL_MS, periodic)
+
+    def _on_event(self, event):
+        # event.time is the X server's clock; the smallest offset seen stands
+        # in for zero latency, so later events are measured against it
+        now = time.perf_counter() * 1000
+        offset = now - event.time
+        if self._clock_offset is None or offset < self._clock_offset:
+            self._clock_offset = offset
+        name = f"event.{event.keysym}" if getattr(event, "keysym", "??") != "??" else f"event.button{event.num}"
+        self.add(name, (offset - self._clock_offset) / 1000)
+
+    def toggle_capture(self):
+        """Start a cProfile capture, or stop the running one and save it; returns the saved path."""
+        if self.capture is None:
+            self.capture = cProfile.Profile()
+            self.capture.enable()
+            return None
+        self.capture.disable()
+        path = self.log_path.rsplit(".", 1)[0] + datetime.now().strftime("-%Y%m%d-%H%M%S.prof")
+        self.capture.dump_stats(path)
+        summary = io.StringIO()
+        pstats.Stats(self.capture, stream=summary).sort_stats("cumulative").print_stats(25)
+        self.capture = None
+        if self.logger:
+            self.logger.info(json.dumps({"time": datetime.now().isoformat(timespec="seconds"),
+                                         "cprofile": path, "top": summary.getvalue()}))
+        return path
+
+
+PROFILER = Profiler()
+
+
+def profiled(name):
+    """Decorator: record the call under name while profiling is enabled."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                PROFILER.add(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
@@ -0,0 +1,141 @@
+import uuid
+from bisect import bisect_left, bisect_right
+
+# Ranks are base-36 strings compared lexicographically; a task's place in the
+# list is its rank, so reordering rewrites one task instead of shifting indexes
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+# Ranks longer than this trigger a rebalance of the whole list
+MAX_RANK_LEN = 16
+
+
+def new_id():
+    """Return a fresh persistent task id."""
+    return uuid.uuid4().hex[:16]
+
+
+def rank_key(task):
+    # Read from the slot: this runs for every step of every bisect over the list
+    return task.rank
+
+
+def rank_between(before=None, after=None):
+    """Return a rank that sorts strictly between before and after (None = open end)."""
+    if after is None and before:
+        return _rank_after(before)
+    lo = before or ""
+    hi = after
+    prefix = []
+    i = 0
+    while True:
+        lo_d = DIGITS.index(lo[i]) if i < len(lo) else 0
+        if hi is None:
+            hi_d = BASE
+        elif i < len(hi):
+            hi_d = DIGITS.index(hi[i])
+        else:
+            raise ValueError(f"no rank between {before!r} and {after!r}")
+        if hi_d - lo_d > 1:
+            prefix.append(DIGITS[(lo_d + hi_d) // 2])
+            return "".join(prefix)
+        prefix.append(DIGITS[lo_d])
+        if hi_d - lo_d == 1:
+            # Anything that continues this prefix is already below `after`
+            hi = None
+        i += 1
+
+
+def _rank_after(rank):
+    # Increment at the same width so long runs of appends keep ranks short
+    digits = [DIGITS.index(c) for c in rank]
+    for i in range(len(digits) - 1, -1, -1):
+        if digits[i] < BASE - 1:
+            digits[i] += 1
+            return "".join(DIGITS[d] for d in digits[:i + 1]) + "0" * (len(digits) - i - 1)
+    return rank + DIGITS[1]
+
+
+def ranks_between(before, after, count):
+    """count increasing ranks strictly between before and after, by repeated halving."""
+    if count <= 0:
+        return []
+    middle = rank_between(before, after)
+    left = (count - 1) // 2
+    return ranks_between(before, middle, left) + [middle] + ranks_between(middle, after, count - 1 - left)
+
+
+def initial_ranks(count):
+    """Evenly spaced ranks for count tasks, leaving the upper half free for appends."""
+    width = 1
+    while BASE ** width < 4 * (count + 1):
+        width += 1
+    step = BASE ** width // 2 // (count + 1)
+    ranks = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(width):
+            value, d = divmod(value, BASE)
+            digits.append(DIGITS[d])
+        ranks.append("".join(reversed(digits)))
+    return ranks
+
+
+def assign_ranks(tasks):
+    """Re-rank tasks in their current list order."""
+    for task, rank in zip(tasks, initial_ranks(len(tasks))):
+        task["rank"] = rank
+
+
+def normalize_tasks(tasks):
+    """Give tasks from older files ids and ranks; return True if anything changed."""
+    changed = False
+    for task in tasks:
+        if "id" not in task:
+            task["id"] = new_id()
+            changed = True
+    ranks = [task.get("rank") for task in tasks]
+    if None in ranks or any(a >= b for a, b in zip(ranks, ranks[1:])):
+        assign_ranks(tasks)
+        changed = True
+    return changed
+
+
+def index_of(tasks, task):
+    """Position of task in a rank-ordered list, by binary search."""
+    idx = bisect_left(tasks, task.rank, key=rank_key)
+    while tasks[idx] is not task:
+        idx += 1
+    return idx
+
+
+def apply_record(tasks, record, by_id):
+    """
+    Apply one mutation record to a rank-ordered list of Task objects in place.
+
+    by_id maps task id to task and is kept in sync. Records are:
+    {"op": "add", "task": {...}}, {"op": "delete", "id": ...},
+    {"op": "update", "id": ..., "fields": {...}} and {"op": "set", "tasks": [...]}.
+    """
+    op = record["op"]
+    if op == "add":
+        task = record["task"]
+        tasks.insert(bisect_right(tasks, task.rank, key=rank_key), task)
+        by_id[task.id] = task
+    elif op == "delete":
+        task = by_id.pop(record["id"])
+        del tasks[index_of(tasks, task)]
+    elif op == "update":
+        task = by_id[record["id"]]
+        fields = record["fields"]
+        if "rank" in fields and fields["rank"] != task.rank:
+            del tasks[index_of(tasks, task)]
+            task.update(fields)
+            tasks.insert(bisect_right(tasks, task.rank, key=rank_key), task)
+        else:
+            task.update(fields)
+    elif op == "set":
+        tasks[:] = record["tasks"]
+        by_id.clear()
+        by_id.update((task["id"], task) for task in tasks if "id" in task)
+
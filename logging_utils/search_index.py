@@ -0,0 +1,135 @@
+import re
+from bisect import bisect_left, insort
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Facet words accepted in a search query, e.g. "report is:open p:high";
+# "is:archived" searches the archive instead of the task list
+STATUS_FACETS = ("done", "open", "overdue", "archived")
+PRIORITY_FACETS = {"low": "Low", "medium": "Medium", "high": "High"}
+
+
+def tokenize(text):
+    """Lowercased word tokens of a description."""
+    return set(TOKEN_RE.findall((text or "").lower()))
+
+
+def parse_query(text):
+    """
+    Split a search string into word prefixes and facets.
+
+    Returns (terms, status, priorities): `status` is a set of STATUS_FACETS
+    names from "is:" words and `priorities` a set of priority names from
+    "p:" words. Unknown facets are searched as plain words.
+    """
+    terms, status, priorities = [], set(), set()
+    for word in (text or "").lower().split():
+        name, _, value = word.partition(":")
+        if name == "is" and value in STATUS_FACETS:
+            status.add(value)
+        elif name == "p" and value in PRIORITY_FACETS:
+            priorities.add(PRIORITY_FACETS[value])
+        else:
+            terms.extend(TOKEN_RE.findall(word))
+    return terms, status, priorities
+
+
+class SearchIndex:
+    """
+    Inverted index over task descriptions, plus completion and priority facets.
+
+    Every distinct token maps to the ids of the tasks containing it, and the
+    tokens are also kept in one sorted list so a prefix resolves to a
+    contiguous slice of it. A lookup therefore costs time in the number of
+    matching tokens and tasks, not in the size of the list.
+    """
+
+    def __init__(self):
+        self.postings = {}  # token -> ids of tasks containing it
+        self.tokens = []  # sorted distinct tokens
+        self.task_tokens = {}  # task id -> tokens indexed for it
+        self.completed = set()
+        self.open = set()
+        self.by_priority = {}  # priority -> ids
+
+    def rebuild(self, tasks):
+        self.__init__()
+        for task in tasks:
+            self._index(task)
+        # One sort of the distinct tokens instead of an insort per new token
+        self.tokens = sorted(self.postings)
+
+    def add(self, task):
+        """Index or re-index one task after its description, priority or completion changed."""
+        self.remove(task["id"])
+        for token in self._index(task):
+            insort(self.tokens, token)
+
+    def _index(self, task):
+        # Index one task; returns the tokens that are new to the index
+        task_id = task["id"]
+        tokens = tokenize(task.get("desc", ""))
+        self.task_tokens[task_id] = tokens
+        new = []
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                new.append(token)
+            ids.add(task_id)
+        (self.completed if task.get("completed", False) else self.open).add(task_id)
+        self.by_priority.setdefault(task.get("priority"), set()).add(task_id)
+        return new
+
+    def remove(self, task_id):
+        tokens = self.task_tokens.pop(task_id, None)
+        if tokens is None:
+            return
+        for token in tokens:
+            ids = self.postings[token]
+            ids.discard(task_id)
+            if not ids:
+                del self.postings[token]
+                del self.tokens[bisect_left(self.tokens, token)]
+        self.completed.discard(task_id)
+        self.open.discard(task_id)
+        for ids in self.by_priority.values():
+            ids.discard(task_id)
+
+    def prefix(self, term):
+        """Ids of tasks with a token starting with term."""
+        start = bisect_left(self.tokens, term)
+        end = bisect_left(self.tokens, term + "\uffff", start)
+        if end - start == 1:
+            return self.postings[self.tokens[start]]
+        ids = set()
+        for token in self.tokens[start:end]:
+            ids.update(self.postings[token])
+        return ids
+
+    def match(self, terms, status=(), priorities=(), overdue=None):
+        """
+        Ids of tasks matching every term prefix and facet.
+
+        `overdue` is the set of overdue ids, needed for the "overdue" status.
+        Returns None when nothing constrains the result.
+        """
+        candidates = [self.prefix(term) for term in terms]
+        if "done" in status:
+            candidates.append(self.completed)
+        if "open" in status:
+            candidates.append(self.open)
+        if "overdue" in status:
+            candidates.append(overdue or set())
+        if priorities:
+            candidates.append(set().union(*(self.by_priority.get(p, ()) for p in priorities)))
+        if not candidates:
+            return None
+        # Intersect starting from the smallest set so the work follows the matches
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            if not result:
+                break
+            result.intersection_update(ids)
+        return result
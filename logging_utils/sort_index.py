@@ -0,0 +1,121 @@
+from bisect import bisect_left, insort
+from collections.abc import Sequence
+from logging_utils.storage import PRIORITY_RANK
+
+
+def _priority_key(task):
+    # High first; unknown priorities after Low
+    return (-PRIORITY_RANK.get(task.get("priority"), -1),)
+
+
+def _due_key(task):
+    # Earliest first; tasks without a due date last
+    due = task.get("due_date") or ""
+    return (not due, due)
+
+
+def _timestamp_key(task):
+    return (task.get("timestamp", ""),)
+
+
+def _desc_key(task):
+    # Alphabetical, ignoring case
+    return (task.get("desc", "").casefold(),)
+
+
+def _status_key(task):
+    # Open tasks first, then by priority and due date
+    return (bool(task.get("completed", False)),) + _priority_key(task) + _due_key(task)
+
+
+# Sort orders by name; each key is extended with the rank, so ties keep the
+# manual order and every entry has a unique position
+SORT_KEYS = {
+    "priority": _priority_key,
+    "due_date": _due_key,
+    "timestamp": _timestamp_key,
+    "desc": _desc_key,
+    "status": _status_key,
+}
+
+
+def sort_key(order, task):
+    return SORT_KEYS[order](task) + (task["rank"],)
+
+
+class SortIndex:
+    """
+    Task ids kept sorted by each requested order.
+
+    An order is built the first time it is asked for and then maintained one
+    task at a time: a change removes the task's old entry and insorts the new
+    one, so switching views or adding a task never re-sorts the list.
+    """
+
+    def __init__(self):
+        self.entries = {}  # order -> sorted list of (key, task id)
+        self.keys = {}  # order -> {task id: key}
+
+    def build(self, order, tasks):
+        keys = {task["id"]: sort_key(order, task) for task in tasks}
+        self.keys[order] = keys
+        self.entries[order] = sorted((key, task_id) for task_id, key in keys.items())
+
+    def rebuild(self, tasks):
+        for order in list(self.entries):
+            self.build(order, tasks)
+
+    def add(self, task):
+        """Index or re-index one task in every built order."""
+        task_id = task["id"]
+        self.remove(task_id)
+        for order, entries in self.entries.items():
+            key = sort_key(order, task)
+            self.keys[order][task_id] = key
+            insort(entries, (key, task_id))
+
+    def remove(self, task_id):
+        for order, entries in self.entries.items():
+            key = self.keys[order].pop(task_id, None)
+            if key is not None:
+                del entries[bisect_left(entries, (key, task_id))]
+
+    def position(self, order, task_id):
+        """Position of a task in an ascending order."""
+        return bisect_left(self.entries[order], (self.keys[order][task_id], task_id))
+
+
+class SortedView(Sequence):
+    """Read-only list of a TaskManager's tasks in a sort order, resolved per item."""
+
+    def __init__(self, manager, order, descending=False):
+        self.manager = manager
+        self.order = order
+        self.descending = descending
+        index = manager.sort_index
+        if order not in index.entries:
+            with manager.lock:
+                index.build(order, manager.tasks)
+
+    def _entries(self):
+        return self.manager.sort_index.entries[self.order]
+
+    def __len__(self):
+        return len(self._entries())
+
+    def __getitem__(self, i):
+        entries = self._entries()
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(entries)))]
+        if i < 0:
+            i += len(entries)
+        if not 0 <= i < len(entries):
+            raise IndexError(i)
+        if self.descending:
+            i = len(entries) - 1 - i
+        return self.manager.by_id[entries[i][1]]
+
+    def position(self, task_id):
+        """Position of a task in this view."""
+        pos = self.manager.sort_index.position(self.order, task_id)
+        return len(self._entries()) - 1 - pos if self.descending else pos
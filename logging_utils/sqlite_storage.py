@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import sqlite3
+from datetime import datetime
+from logging_utils.locking import ConflictError
+from logging_utils.storage import StorageBackend, PRIORITY_RANK, DUE_FORMAT
+from logging_utils.records import normalize_tasks
+
+# Stored in PRAGMA user_version; raise it when the schema below changes
+SCHEMA_VERSION = 1
+FIELDS = ("rank", "desc", "timestamp", "completed", "completed_at", "priority", "due_date")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    rank TEXT NOT NULL,
+    desc TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL DEFAULT '',
+    completed INTEGER NOT NULL DEFAULT 0,
+    completed_at TEXT NOT NULL DEFAULT '',
+    priority TEXT NOT NULL DEFAULT 'Medium',
+    priority_rank INTEGER NOT NULL DEFAULT 1,
+    due_date TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS tasks_rank ON tasks (rank);
+CREATE INDEX IF NOT EXISTS tasks_due_date ON tasks (due_date);
+CREATE INDEX IF NOT EXISTS tasks_priority ON tasks (priority_rank);
+CREATE INDEX IF NOT EXISTS tasks_completed ON tasks (completed, due_date);
+"""
+
+COLUMNS = "id, rank, desc, timestamp, completed, completed_at, priority, due_date"
+INSERT = ("INSERT INTO tasks (id, rank, desc, timestamp, completed, completed_at, priority, priority_rank, due_date)"
+          " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def _row_values(task):
+    priority = task.get("priority", "Medium")
+    return (
+        task["id"],
+        task["rank"],
+        task.get("desc", ""),
+        task.get("timestamp", ""),
+        int(bool(task.get("completed", False))),
+        task.get("completed_at") or "",
+        priority,
+        PRIORITY_RANK.get(priority, 1),
+        task.get("due_date", ""),
+    )
+
+
+def _row_task(row):
+    task_id, rank, desc, timestamp, completed, completed_at, priority, due_date = row
+    task = {
+        "id": task_id,
+        "rank": rank,
+        "desc": desc,
+        "timestamp": timestamp,
+        "completed": bool(completed),
+        "priority": priority,
+        "due_date": due_date
+    }
+    # Stored as '' when unset; left out like in the JSON file so both compare equal
+    if completed_at:
+        task["completed_at"] = completed_at
+    return task
+
+
+def _insert_all(conn, tasks):
+    normalize_tasks(tasks)
+    conn.executemany(INSERT, (_row_values(task) for task in tasks))
+
+
+def connect(db_path):
+    """Open the task database in WAL mode, creating the schema in a new one."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return conn
+
+
+def migrate_json(json_path, db_path):
+    """
+    One-shot import of a todo_tasks.json list into an empty task database.
+
+    A database that does not exist yet is built under a temporary name and
+    moved into place only once the import succeeded, so an unreadable JSON
+    file leaves no empty database behind to hide its tasks from later runs.
+    """
+    with open(json_path, "r") as f:
+        tasks = json.load(f)
+    if not isinstance(tasks, list):
+        raise ValueError(f"{json_path} does not hold a task list")
+    target = db_path if os.path.exists(db_path) else db_path + ".tmp"
+    if target != db_path:
+        for stale in (target, target + "-wal", target + "-shm"):
+            if os.path.exists(stale):
+                os.remove(stale)
+    conn = connect(target)
+    try:
+        if conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]:
+            return 0
+        with conn:
+            _insert_all(conn, tasks)
+    finally:
+        conn.close()
+    if target != db_path:
+        os.replace(target, db_path)
+    return len(tasks)
+
+
+class SqliteStorage(StorageBackend):
+    """
+    Tasks in a SQLite table keyed by task id and ordered by rank; each mutation touches one row.
+
+    Row writes from several instances interleave safely; changes made by
+    other connections are noticed through PRAGMA data_version, and only the
+    whole-table rewrite of save() is refused with ConflictError after one.
+    """
+
+    # The connection opened by load() belongs to the thread that opened it
+    background_load = False
+
+    def __init__(self, db_path, json_path=None):
+        self.db_path = db_path
+        self.json_path = json_path
+        self.conn = None
+        self.version = None  # data_version when the table was last read
+
+    def load(self):
+        fresh = not os.path.exists(self.db_path)
+        if fresh and self.json_path and os.path.exists(self.json_path):
+            migrate_json(self.json_path, self.db_path)
+        self.conn = connect(self.db_path)
+        return self.reload()
+
+    def changed(self):
+        # data_version only moves for commits made through other connections
+        return self.conn is not None and self._data_version() != self.version
+
+    def reload(self):
+        self.version = self._data_version()
+        rows = self.conn.execute(f"SELECT {COLUMNS} FROM tasks ORDER BY rank").fetchall()
+        return [_row_task(row) for row in rows]
+
+    def save(self, tasks):
+        if self.changed():
+            raise ConflictError(self.db_path)
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            _insert_all(self.conn, tasks)
+
+    def commit(self, record, tasks):
+        self.commit_many([record], tasks)
+
+    def commit_many(self, records, tasks):
+        # One transaction for the whole batch
+        if any(record["op"] == "set" for record in records):
+            self.save(tasks)
+            return
+        with self.conn:
+            for record in records:
+                op = record["op"]
+                if op == "add":
+                    self.conn.execute(INSERT, _row_values(record["task"]))
+                elif op == "delete":
+                    self.conn.execute("DELETE FROM tasks WHERE id = ?", (record["id"],))
+                elif op == "update":
+                    self._update(record["id"], record["fields"])
+
+    def query(self, completed=None, overdue=None, priority=None, order_by=None, now=None):
+        clauses, params = [], []
+        if completed is not None:
+            clauses.append("completed = ?")
+            params.append(int(completed))
+        if priority is not None:
+            clauses.append("priority = ?")
+            params.append(priority)
+        if overdue is not None:
+            today = (now or datetime.now()).strftime(DUE_FORMAT)
+            clause = "(completed = 0 AND due_date != '' AND due_date <= ?)"
+            clauses.append(clause if overdue else f"NOT {clause}")
+            params.append(today)
+        order = {
+            "priority": "priority_rank DESC, rank",
+            "due_date": "due_date, rank",
+        }.get(order_by, "rank")
+        sql = f"SELECT {COLUMNS} FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY " + order
+        return [_row_task(row) for row in self.conn.execute(sql, params)]
+
+    def close(self, tasks):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _update(self, task_id, fields):
+        columns = [f"{name} = ?" for name in fields if name in FIELDS]
+        # Undo restores fields a task never had as None
+        params = [int(bool(value)) if name == "completed" else "" if value is None else value
+                  for name, value in fields.items() if name in FIELDS]
+        if "priority" in fields:
+            columns.append("priority_rank = ?")
+            params.append(PRIORITY_RANK.get(fields["priority"], 1))
+        if columns:
+            self.conn.execute(f"UPDATE tasks SET {', '.join(columns)} WHERE id = ?", params + [task_id])
+
+
+if __name__ == "__main__":
+    # python -m logging_utils.sqlite_storage [todo_tasks.json] [todo_tasks.db]
+    from logging_utils.log_handler import LOG_FILE, DB_FILE
+    json_path = sys.argv[1] if len(sys.argv) > 1 else LOG_FILE
+    db_path = sys.argv[2] if len(sys.argv) > 2 else DB_FILE
+    print(f"Imported {migrate_json(json_path, db_path)} tasks into {db_path}")
@@ -0,0 +1,287 @@
+import os
+import re
+import json
+from datetime import datetime
+from logging_utils.journal import Journal, atomic_write, encode_snapshot
+from logging_utils.locking import ConflictError, file_lock, file_version
+from logging_utils.writer import SnapshotWriter, SAVE_WINDOW
+
+PRIORITY_RANK = {"Low": 0, "Medium": 1, "High": 2}
+DUE_FORMAT = "%Y-%m-%d"
+# Bytes read at a time when streaming a JSON array
+READ_BLOCK = 64 * 1024
+_WHITESPACE = re.compile(r"\s*")
+_ELEMENT_END = re.compile(r"\s*[,\]]")
+
+
+def iter_json_array(f, block_size=READ_BLOCK):
+    """
+    Yield the elements of the JSON array in text file f, reading it a block at a time.
+
+    Raises ValueError where json.load would, e.g. for a missing or doubled
+    comma between elements or data after the closing bracket; elements
+    before the bad part have been yielded by then.
+    """
+    decoder = json.JSONDecoder()
+    block = f.read(block_size)
+    buf = block.lstrip()
+    while block and not buf:
+        block = f.read(block_size)
+        buf = block.lstrip()
+    if not buf.startswith("["):
+        raise ValueError("not a JSON array")
+    pos, eof = 1, False
+    expect_element = True  # False right after an element, when only "," or "]" may follow
+    empty = True
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            if eof:
+                raise ValueError("unterminated JSON array")
+            more = f.read(block_size)
+            eof = not more
+            buf, pos = more, 0
+            continue
+        char = buf[pos]
+        if char == "]" and (empty or not expect_element):
+            if buf[pos + 1:].strip() or f.read().strip():
+                raise ValueError("extra data after the JSON array")
+            return
+        if not expect_element:
+            if char != ",":
+                raise ValueError(f"expected ',' or ']' between array elements, got {char!r}")
+            pos += 1
+            expect_element = True
+            continue
+        try:
+            # Unless a separator follows, the element may be cut short (e.g. a number)
+            element, end = decoder.raw_decode(buf, pos)
+            complete = eof or _ELEMENT_END.match(buf, end) is not None
+        except ValueError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield element
+            pos = end
+            expect_element = empty = False
+            continue
+        more = f.read(block_size)
+        eof = not more
+        buf, pos = buf[pos:] + more, 0
+
+
+def query_tasks(tasks, completed=None, overdue=None, priority=None, order_by=None, now=None):
+    """In-memory version of StorageBackend.query for backends without an index."""
+    today = (now or datetime.now()).strftime(DUE_FORMAT)
+    result = []
+    for task in tasks:
+        done = task.get("completed", False)
+        if completed is not None and done != completed:
+            continue
+        if priority is not None and task.get("priority") != priority:
+            continue
+        if overdue is not None:
+            due = task.get("due_date", "")
+            if (not done and bool(due) and due <= today) != overdue:
+                continue
+        result.append(task)
+    if order_by == "priority":
+        result.sort(key=lambda t: -PRIORITY_RANK.get(t.get("priority"), 1))
+    elif order_by == "due_date":
+        result.sort(key=lambda t: t.get("due_date", ""))
+    return result
+
+
+class StorageBackend:
+    """
+    Where a TaskManager keeps its tasks.
+
+    TaskManager owns the in-memory list; a backend loads it once and is then
+    told about every mutation as a small record (the same records the journal
+    stores), so it can persist just that change.
+    """
+
+    def attach(self, manager):
+        """Called once by the owning TaskManager before load()."""
+        self.manager = manager
+
+    # Whether load_chunks() may run on another thread than the later calls
+    background_load = True
+    # Whether save() and commit() only queue the write for another thread
+    writes_in_background = False
+
+    def load(self):
+        """Return the stored task list."""
+        raise NotImplementedError
+
+    def load_chunks(self, size):
+        """Yield the stored tasks in order, in lists of about size tasks."""
+        yield self.load()
+
+    def save(self, tasks):
+        """Persist the whole task list."""
+        raise NotImplementedError
+
+    def commit(self, record, tasks):
+        """Persist one mutation; tasks is the list after the change."""
+        self.save(tasks)
+
+    def commit_many(self, records, tasks):
+        """Persist a batch of mutations at once; tasks is the list after all of them."""
+        self.save(tasks)
+
+    def changed(self):
+        """True if another instance saved since this one last read or wrote the store."""
+        return False
+
+    def reload(self):
+        """
+        Read the tasks as stored now, for merging what another instance saved.
+
+        Later conflict checks are against the version read. Returns None if
+        the store cannot be read; the next save then replaces it.
+        """
+        return self.load()
+
+    def query(self, completed=None, overdue=None, priority=None, order_by=None, now=None):
+        """Run a filtered query in the store, or return None to filter in memory."""
+        return None
+
+    def flush(self):
+        """Block until every change so far is persisted."""
+
+    def close(self, tasks):
+        """Persist anything outstanding and release resources."""
+        self.flush()
+
+
+class JsonStorage(StorageBackend):
+    """
+    The plain todo_tasks.json snapshot, optionally written from a background thread.
+
+    Every write happens under file_lock() and only if the file is still the
+    version this instance last read or wrote; otherwise ConflictError is
+    raised and the manager merges the other instance's tasks first.
+    """
+
+    def __init__(self, path, async_save=False, save_window=SAVE_WINDOW):
+        self.path = path
+        self.async_save = async_save
+        self.writes_in_background = async_save
+        self.save_window = save_window
+        self.writer = None
+        self.version = None  # file_version() of the file as last read or written
+
+    def attach(self, manager):
+        super().attach(manager)
+        if self.async_save:
+            self.writer = SnapshotWriter(self._write_snapshot, self.save_window)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self.version = None
+            return []
+        with open(self.path, "r") as f:
+            self.version = file_version(f.fileno())
+            try:
+                return json.load(f)
+            except Exception:
+                return []
+
+    def load_chunks(self, size):
+        # Parse array elements as the file is read instead of all at once
+        if not os.path.exists(self.path):
+            self.version = None
+            return
+        chunk = []
+        with open(self.path, "r") as f:
+            self.version = file_version(f.fileno())
+            try:
+                for task in iter_json_array(f):
+                    chunk.append(task)
+                    if len(chunk) >= size:
+                        yield chunk
+                        chunk = []
+            except ValueError:
+                pass  # A damaged file loads as far as it can be read
+        if chunk:
+            yield chunk
+
+    def changed(self):
+        return file_version(self.path) != self.version
+
+    def reload(self):
+        # No lock needed: saves replace the file in one rename
+        try:
+            with open(self.path, "r") as f:
+                self.version = file_version(f.fileno())
+                tasks = json.load(f)
+        except FileNotFoundError:
+            self.version = None
+            return []
+        except ValueError:
+            return None
+        return tasks if isinstance(tasks, list) else None
+
+    def save(self, tasks):
+        if self.writer:
+            self.writer.mark_dirty()
+            return
+        with file_lock(self.path):
+            if self.changed():
+                raise ConflictError(self.path)
+            atomic_write(self.path, encode_snapshot(tasks))
+            self.version = file_version(self.path)
+
+    def _write_snapshot(self):
+        # Runs on the writer thread. The snapshot takes the manager's record of
+        # unsaved changes along; it is handed back if the write fails.
+        with file_lock(self.path):
+            if self.changed():
+                raise ConflictError(self.path)
+            tasks, base = self.manager.snapshot(take_base=True)
+            try:
+                atomic_write(self.path, encode_snapshot(tasks))
+            except OSError:
+                self.manager.restore_base(base)
+                raise
+            self.version = file_version(self.path)
+
+    def flush(self):
+        if self.writer:
+            self.writer.flush()
+            if self.writer.error is not None:
+                # The changes stay pending in the writer: a conflict is merged and
+                # saved again by the manager, an OSError goes up to the caller
+                error, self.writer.error = self.writer.error, None
+                raise error
+
+    def close(self, tasks):
+        if self.writer:
+            self.writer.close()
+            if self.writer.error is not None:
+                raise self.writer.error
+
+
+class JournalStorage(StorageBackend):
+    """The JSON snapshot plus an append-only journal of records."""
+
+    def __init__(self, path):
+        self.path = path
+        self.journal = Journal(path)
+
+    def load(self):
+        return self.journal.load()
+
+    def save(self, tasks):
+        self.journal.compact(tasks)
+
+    def commit(self, record, tasks):
+        self.journal.append(record, tasks)
+
+    def commit_many(self, records, tasks):
+        self.journal.append_many(records, tasks)
+
+    def close(self, tasks):
+        self.journal.close(tasks)
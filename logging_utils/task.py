@@ -0,0 +1,237 @@
+import re
+import sys
+from collections.abc import MutableMapping
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+# Priority codes are positions in this tuple, the same order as PRIORITY_RANK
+PRIORITIES = ("Low", "Medium", "High")
+_PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITIES)}
+_EPOCH = date(1970, 1, 1)
+_EPOCH_DAY = _EPOCH.toordinal()
+_DAY = 86400
+_MISSING = object()
+_TIME = re.compile(r"(\d{4}-\d\d-\d\d) ([01]\d|2[0-3]):([0-5]\d):([0-5]\d)", re.ASCII)
+_TWO_DIGITS = [f"{n:02d}" for n in range(60)]
+
+
+# Tasks share a few hundred distinct days, so day strings are converted once each
+@lru_cache(maxsize=4096)
+def _day_number(text):
+    if len(text) == 10 and text[4] == text[7] == "-":
+        digits = text[:4] + text[5:7] + text[8:]
+        if digits.isdigit() and digits.isascii():
+            try:
+                return date(int(text[:4]), int(text[5:7]), int(text[8:])).toordinal() - _EPOCH_DAY
+            except ValueError:
+                pass
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _day_text(number):
+    return date.fromordinal(number + _EPOCH_DAY).isoformat()
+
+
+def _parse_day(value):
+    # "YYYY-MM-DD" as days since 1970; anything that would not format back the same stays as is
+    if type(value) is str:
+        number = _day_number(value)
+        if number is not None:
+            return number
+    return value
+
+
+def _format_day(value):
+    return _day_text(value) if type(value) is int else value
+
+
+def _parse_time(value):
+    # "YYYY-MM-DD HH:MM:SS" as seconds since 1970, read as wall-clock time (no time zone)
+    if type(value) is str:
+        match = _TIME.fullmatch(value)
+        if match:
+            day, hour, minute, second = match.groups()
+            day = _day_number(day)
+            if day is not None:
+                return ((day * 24 + int(hour)) * 60 + int(minute)) * 60 + int(second)
+    return value
+
+
+def _format_time(value):
+    if type(value) is not int:
+        return value
+    day, seconds = divmod(value, _DAY)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return f"{_day_text(day)} {_TWO_DIGITS[hour]}:{_TWO_DIGITS[minute]}:{_TWO_DIGITS[second]}"
+
+
+def _parse_priority(value):
+    return _PRIORITY_CODES.get(value, value) if type(value) is str else value
+
+
+def _format_priority(value):
+    return PRIORITIES[value] if type(value) is int else value
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+def _same(value):
+    return value
+
+
+# Dict key -> (slot, encode, decode), in the key order tasks are written in
+_FIELDS = {
+    "id": ("id", _same, _same),
+    "rank": ("rank", _same, _same),
+    "desc": ("desc", _intern, _same),
+    "timestamp": ("created", _parse_time, _format_time),
+    "completed": ("completed", _same, _same),
+    "priority": ("priority", _parse_priority, _format_priority),
+    "due_date": ("due", _parse_day, _format_day),
+    "completed_at": ("completed_at", _parse_time, _format_time),
+}
+
+
+class Task(MutableMapping):
+    """
+    One task, held compactly but read and written like the dict it replaces.
+
+    Slots instead of a per-task dict; the priority is a code into PRIORITIES,
+    "timestamp" and "completed_at" are seconds and "due_date" days since
+    1970, and descriptions are interned. task["due_date"], get() and
+    to_dict() give back the on-disk strings, so the JSON format and code
+    written against dicts do not change. A value that would not format back
+    to the same string (a malformed date, an unknown priority) is kept as
+    given, a slot holding None is a missing key, and keys other than the
+    task fields go to a small dict of their own.
+    """
+
+    __slots__ = ("id", "rank", "desc", "created", "completed", "priority", "due", "completed_at", "extra")
+
+    def __init__(self, fields=None):
+        get = (fields or {}).get
+        self.id = get("id")
+        self.rank = get("rank")
+        self.desc = _intern(get("desc"))
+        self.created = _parse_time(get("timestamp"))
+        self.completed = get("completed")
+        self.priority = _parse_priority(get("priority"))
+        self.due = _parse_day(get("due_date"))
+        self.completed_at = _parse_time(get("completed_at"))
+        self.extra = None
+        if fields and not _FIELDS.keys() >= fields.keys():
+            self.extra = {key: value for key, value in fields.items() if key not in _FIELDS}
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        field = _FIELDS.get(key)
+        if field is None:
+            return self.extra.get(key, default) if self.extra else default
+        value = getattr(self, field[0])
+        return default if value is None else field[2](value)
+
+    def __setitem__(self, key, value):
+        field = _FIELDS.get(key)
+        if field is not None:
+            setattr(self, field[0], field[1](value))
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        field = _FIELDS.get(key)
+        if field is not None:
+            setattr(self, field[0], None)
+        else:
+            del self.extra[key]
+
+    def __contains__(self, key):
+        field = _FIELDS.get(key)
+        if field is None:
+            return bool(self.extra) and key in self.extra
+        return getattr(self, field[0]) is not None
+
+    def __iter__(self):
+        for key, field in _FIELDS.items():
+            if getattr(self, field[0]) is not None:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+    def copy(self):
+        task = Task()
+        for slot in self.__slots__:
+            setattr(task, slot, getattr(self, slot))
+        if self.extra:
+            task.extra = dict(self.extra)
+        return task
+
+    def to_dict(self):
+        """The task as a plain dict in the on-disk format."""
+        # Spelled out rather than driven by _FIELDS: this runs for every task on every save
+        result = {"id": self.id, "rank": self.rank, "desc": self.desc, "timestamp": _format_time(self.created),
+                  "completed": self.completed, "priority": _format_priority(self.priority),
+                  "due_date": _format_day(self.due)}
+        if self.completed_at is not None:
+            result["completed_at"] = _format_time(self.completed_at)
+        if None in result.values():
+            result = {key: value for key, value in result.items() if value is not None}
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+    def when(self, key):
+        """The datetime of "timestamp", "completed_at" or "due_date", without re-parsing; None if unset or malformed."""
+        value = getattr(self, _FIELDS[key][0])
+        if type(value) is not int:
+            return _parse_datetime(value, key)
+        if key == "due_date":
+            return datetime.fromordinal(value + _EPOCH_DAY)
+        return datetime.fromordinal(_EPOCH_DAY) + timedelta(seconds=value)
+
+
+def _parse_datetime(value, key):
+    # For strings the compact form kept as given, e.g. a due date of "2025-6-1"
+    try:
+        return datetime.strptime(value, "%Y-%m-%d" if key == "due_date" else "%Y-%m-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return None
+
+
+def to_task(task):
+    """task as a Task; Task objects are returned as they are."""
+    return task if isinstance(task, Task) else Task(task)
+
+
+def as_dict(task):
+    """A plain-dict copy of a Task or dict; also the json `default` for Task objects."""
+    if isinstance(task, Task):
+        return task.to_dict()
+    if isinstance(task, dict):
+        return dict(task)
+    raise TypeError(f"Object of type {type(task).__name__} is not JSON serializable")
+
+
+def time_of(task, key):
+    """The datetime of a task's "timestamp", "completed_at" or "due_date"; None if unset or malformed."""
+    if isinstance(task, Task):
+        return task.when(key)
+    return _parse_datetime(task.get(key), key)
@@ -0,0 +1,100 @@
+import time
+import threading
+from logging_utils.locking import ConflictError
+
+# Changes arriving within this many seconds of each other share one write
+SAVE_WINDOW = 0.25
+
+
+class SnapshotWriter:
+    """
+    Background thread that persists task snapshots off the Tk main thread.
+
+    Mutations only mark the writer dirty. The worker waits until no change has
+    arrived for `window` seconds, then calls `write`, which takes one snapshot
+    and replaces the file atomically, so a burst of edits becomes a single
+    write. A write that fails with OSError or ConflictError stays pending
+    and is retried after another quiet window; a flush or close that hits
+    the failure returns with it in `error`, for the owner to report or, for
+    a conflict, to merge and save again.
+    """
+
+    def __init__(self, write, window=SAVE_WINDOW):
+        self.window = window
+        self.changes = 0  # Mutations reported through mark_dirty
+        self.writes = 0  # Snapshots actually written
+        self.coalesced = 0  # Mutations that were folded into another write
+        self.error = None  # Last write error, if any
+        self._write = write
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._last_change = 0.0
+        self._writing = False
+        self._flushing = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self):
+        """Record that the task list changed; returns immediately."""
+        with self._cond:
+            self.changes += 1
+            self._pending += 1
+            self._last_change = time.monotonic()
+            self._cond.notify_all()
+
+    def flush(self):
+        """Write any pending change now and wait until it is on disk or the write failed."""
+        with self._cond:
+            self._flushing = True
+            self.error = None
+            self._cond.notify_all()
+            while (self._pending or self._writing) and self.error is None:
+                self._cond.wait()
+            self._flushing = False
+
+    def close(self):
+        """Flush, then stop the worker thread; a change that failed to write is left unwritten."""
+        self.flush()
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        return {"changes": self.changes, "writes": self.writes, "coalesced": self.coalesced}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending or (self._closing and self.error is not None):
+                    return
+                # Let the burst settle unless someone is waiting on a flush;
+                # after a failure wait anyway rather than retrying at once
+                while (self.error is not None or not self._flushing) and not self._closing:
+                    remaining = self._last_change + self.window - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                pending, self._pending = self._pending, 0
+                self._writing = True
+
+            try:
+                self._write()
+                error = None
+            except (OSError, ConflictError) as e:
+                error = e
+
+            with self._cond:
+                self._writing = False
+                self.error = error
+                if error is None:
+                    self.writes += 1
+                    self.coalesced += pending - 1
+                else:
+                    # Keep the changes pending; retried after another quiet window
+                    self._pending += pending
+                    self._last_change = time.monotonic()
+                self._cond.notify_all()
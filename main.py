@@ -1,7 +1,16 @@
-from task_manager import open_todo_window
+import sys
+from daemon import parse_args, send
 
 if __name__ == "__main__":
+    flags, command = parse_args(sys.argv[1:])
+    # A running daemon takes the command and this launch ends here, without loading Tk
+    reply = send(command)
+    if reply is not None:
+        if reply != "ok":
+            print(reply)
+        sys.exit(reply != "ok")
     try:
-        open_todo_window()
+        from task_manager import open_todo_window
+        open_todo_window(profile="--profile" in flags, daemon="--daemon" in flags, command=command)
     except Exception as e:
-        print(f"An error occurred: {e}")
\ No newline at end of file
+        print(f"An error occurred: {e}")
@@ -0,0 +1,715 @@
+import math
+import time
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk, font as tkfont
+from logging_utils.profiler import PROFILER, profiled
+
+
+# Row click bindings and the TodoApp.click_row mode each one selects with
+CLICK_MODES = (
+    ("<Button-1>", None),
+    ("<Control-Button-1>", "toggle"),
+    ("<Shift-Button-1>", "range"),
+)
+
+
+class Renderer:
+    """
+    Draws the task matrix of a TodoApp.
+
+    The app decides what each row looks like (see TodoApp.row_look); a
+    renderer owns the widgets, scrolling and double-click handling.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def build(self, parent):
+        """Create the matrix widgets inside parent."""
+        raise NotImplementedError
+
+    def apply_theme(self, theme):
+        """Recolor the matrix chrome for a theme dict."""
+        raise NotImplementedError
+
+    def render(self):
+        """Lay out every visible row after a structural change."""
+        raise NotImplementedError
+
+    def repaint_row(self, idx):
+        """Repaint one task row in place if it is on screen."""
+        raise NotImplementedError
+
+    def repaint_visible(self):
+        """Repaint every on-screen row without changing the layout."""
+        raise NotImplementedError
+
+    def scroll_to(self, idx):
+        """Bring a row into view; True if the visible rows changed."""
+        return False
+
+    def append_rows(self, start):
+        """Show rows added at the end of the list from index start on."""
+        self.render()
+
+    def update_headings(self):
+        """Refresh the column headers from TodoApp.heading."""
+        raise NotImplementedError
+
+
+class RenderScheduler:
+    """
+    Collects repaint requests and applies them once, from an after_idle callback.
+
+    Handlers mark single rows, every visible row, rows appended from an index
+    or the whole layout as dirty. Marks made before the callback runs fold
+    into one frame, where a layout covers everything and each row is painted
+    once however often it was marked, so key auto-repeat or a burst of
+    shortcuts costs one repaint per frame instead of one per event.
+    `requests` counts the marks, `frames` the repaints done and `saved` the
+    difference; the time from a frame's first mark to its end is the latency.
+    """
+
+    def __init__(self, root, renderer):
+        self.root = root
+        self.renderer = renderer
+        self.requests = 0
+        self.frames = 0
+        self.latency_total = 0.0  # Seconds from first mark to painted, over all frames
+        self.latency_max = 0.0
+        self._callback = None  # Pending after_idle id
+        self._marked_at = 0.0
+        self._layout = False
+        self._visible = False
+        self._append_from = None
+        self._rows = set()
+
+    @property
+    def pending(self):
+        return self._callback is not None
+
+    def mark_layout(self):
+        """Lay out the visible rows again, e.g. after rows were added, removed or reordered."""
+        self._layout = True
+        self._request()
+
+    def mark_visible(self):
+        """Repaint every on-screen row without changing the layout."""
+        self._visible = True
+        self._request()
+
+    def mark_rows(self, indices):
+        """Repaint these rows in place; rows out of view are skipped when painted."""
+        self._rows.update(indices)
+        self._request()
+
+    def mark_appended(self, start):
+        """Show rows added at the end of the list from index start on."""
+        if self._append_from is None or start < self._append_from:
+            self._append_from = start
+        self._request()
+
+    def _request(self):
+        self.requests += 1
+        if self._callback is None:
+            self._marked_at = time.perf_counter()
+            self._callback = self.root.after_idle(self.flush)
+
+    @profiled("render.frame")
+    def flush(self):
+        """Paint everything marked so far now; also what the idle callback runs."""
+        if self._callback is None:
+            return
+        self.root.after_cancel(self._callback)
+        self._callback = None
+        layout, self._layout = self._layout, False
+        visible, self._visible = self._visible, False
+        append_from, self._append_from = self._append_from, None
+        rows, self._rows = self._rows, set()
+        if layout:
+            self.renderer.render()
+        else:
+            if append_from is not None:
+                self.renderer.append_rows(append_from)
+            if visible:
+                self.renderer.repaint_visible()
+            # Rows marked by index may lie outside what repaint_visible restyles, so paint them too
+            for idx in sorted(rows):
+                self.renderer.repaint_row(idx)
+        self.frames += 1
+        latency = time.perf_counter() - self._marked_at
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        if PROFILER.enabled:
+            PROFILER.add("render.latency", latency)
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "frames": self.frames,
+            "saved": self.requests - self.frames - self.pending,
+            "mean_latency_ms": round(self.latency_total * 1000 / self.frames, 3) if self.frames else 0.0,
+            "max_latency_ms": round(self.latency_max * 1000, 3),
+        }
+
+
+class PooledRenderer(Renderer):
+    """
+    Base for renderers that keep only viewport-sized rows on a canvas.
+
+    The scrollbar and mouse wheel move `first_row`, the task shown in the
+    top pooled row, and rows are repainted with the tasks under it.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.first_row = 0  # Index of the task shown in the top pooled row
+        self.visible_rows = 0  # Number of rows that fit in the viewport
+        self.shown_rows = 0  # Number of pooled rows currently in use
+        self.shown_first = 0  # first_row as last drawn; clicks on pooled rows refer to it
+
+    def build(self, parent):
+        self.canvas = tk.Canvas(parent, highlightthickness=0)
+        # The scrollbar drives the visible task window, not the canvas itself
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.scroll)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.bind("<Configure>", self._on_configure)
+        root = self.app.root
+        root.bind("<MouseWheel>", lambda e: self.scroll("scroll", -1 if e.delta > 0 else 1, "units"))
+        root.bind("<Button-4>", lambda e: self.scroll("scroll", -1, "units"))
+        root.bind("<Button-5>", lambda e: self.scroll("scroll", 1, "units"))
+
+    def visible_row_count(self):
+        """Number of task rows that fit in the viewport."""
+        raise NotImplementedError
+
+    def layout(self, shown):
+        """Make the first `shown` pooled rows available and hide the rest."""
+        raise NotImplementedError
+
+    def paint(self, slot, idx):
+        """Show task idx in pooled row slot."""
+        raise NotImplementedError
+
+    def _on_configure(self, event=None):
+        # Resize the row pool to the new viewport height
+        if self.visible_row_count() != self.visible_rows:
+            self.render()
+
+    def scroll(self, *args):
+        # Scrollbar and mouse wheel handler: move the window of visible tasks
+        if args[0] == "moveto":
+            first = int(float(args[1]) * len(self.app.rows))
+        else:
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self.visible_rows
+            first = self.first_row + step
+        first = max(0, min(first, len(self.app.rows) - self.visible_row_count()))
+        if first != self.first_row:
+            self.first_row = first
+            self.app.scheduler.mark_layout()
+
+    def scroll_to(self, idx):
+        # Scroll just enough for the given task to be visible
+        visible = self.visible_row_count()
+        first = self.first_row
+        if idx < self.first_row:
+            self.first_row = idx
+        elif idx >= self.first_row + visible:
+            self.first_row = idx - visible + 1
+        return self.first_row != first
+
+    def append_rows(self, start):
+        # Rows below the viewport only change the scrollbar
+        if start < self.first_row + self.visible_row_count():
+            self.render()
+        else:
+            self._update_scrollbar()
+
+    @profiled("render.render")
+    def render(self):
+        # Only as many rows as fit in the viewport exist, so the cost of a
+        # render depends on the window height, not on the number of tasks
+        total = len(self.app.rows)
+        visible = self.visible_row_count()
+        self.first_row = max(0, min(self.first_row, total - visible))
+        shown = min(visible, total - self.first_row)
+        self.layout(shown)
+        for slot in range(shown):
+            self.paint(slot, self.first_row + slot)
+
+        self.visible_rows = visible
+        self.shown_rows = shown
+        self.shown_first = self.first_row
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = len(self.app.rows)
+        visible = self.visible_rows
+        if total:
+            self.scrollbar.set(self.first_row / total, min(1.0, (self.first_row + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    @profiled("render.repaint_row")
+    def repaint_row(self, idx):
+        slot = idx - self.first_row
+        if 0 <= slot < self.shown_rows and idx < len(self.app.rows):
+            self.paint(slot, idx)
+
+    @profiled("render.repaint_visible")
+    def repaint_visible(self):
+        for slot in range(self.shown_rows):
+            self.paint(slot, self.first_row + slot)
+
+
+class LabelGridRenderer(PooledRenderer):
+    """One tk.Label per cell in a gridded frame, recycled row by row."""
+
+    def build(self, parent):
+        super().build(parent)
+        self.tasks_frame = tk.Frame(self.canvas)
+        self.window_id = self.canvas.create_window((0, 0), window=self.tasks_frame, anchor="n")
+        self.tasks_frame.bind("<Configure>", self._center)
+
+        # Header
+        self.header_labels = []
+        for col_idx, col_name in enumerate(self.app.columns):
+            lbl = tk.Label(
+                self.tasks_frame, text=col_name, borderwidth=1, relief="solid",
+                width=self.app.col_widths[col_idx], font=("Segoe UI", 11, "bold"), pady=4
+            )
+            lbl.grid(row=0, column=col_idx, sticky="nsew", padx=2, pady=2)
+            lbl.bind("<Button-1>", lambda e, c=col_idx: self.app.sort_column(c))
+            self.header_labels.append(lbl)
+
+        # Make columns expand
+        for col in range(len(self.app.columns)):
+            self.tasks_frame.grid_columnconfigure(col, weight=1)
+
+        self.row_pool = []  # Reusable row widgets, one list of labels per row
+        self.row_state = []  # Last options applied to each pooled label
+        self.row_mapped = []  # Whether each pooled row is currently gridded
+        self.row_height = None
+        self._add_row()  # Also measures the row height
+
+    def apply_theme(self, theme):
+        self.canvas.configure(bg=theme["main_bg"])
+        self.tasks_frame.configure(bg=theme["cell_bg"])
+        for lbl in self.header_labels:
+            lbl.configure(bg=theme["header_bg"], fg=theme["cell_fg"])
+
+    def update_headings(self):
+        for col_idx, lbl in enumerate(self.header_labels):
+            lbl.configure(text=self.app.heading(col_idx))
+
+    def _center(self, event=None):
+        # The frame is anchored at its top centre
+        x = max(self.canvas.winfo_width(), self.tasks_frame.winfo_reqwidth()) // 2
+        self.canvas.coords(self.window_id, x, 0)
+
+    def _on_configure(self, event=None):
+        self._center()
+        super()._on_configure(event)
+
+    def _add_row(self):
+        # Create the labels of one pooled row; bindings resolve the task index at event time
+        slot = len(self.row_pool)
+        row = []
+        for col_idx in range(len(self.app.columns)):
+            lbl = tk.Label(self.tasks_frame, borderwidth=1, relief="solid",
+                           width=self.app.col_widths[col_idx], padx=4, pady=2)
+            for sequence, mode in CLICK_MODES:
+                lbl.bind(sequence, lambda e, m=mode: self.app.click_row(self.shown_first + slot, m))
+            row.append(lbl)
+        row[1].configure(anchor="w")
+        row[0].bind("<Double-Button-1>", lambda e: self.app.move_task(self.shown_first + slot))
+        row[1].bind("<Double-Button-1>", lambda e: self.app.edit_task(self.shown_first + slot))
+        if self.row_height is None:
+            row[1].configure(font=("Segoe UI", 10, "normal"))
+            self.row_height = max(lbl.winfo_reqheight() for lbl in row)
+        self.row_pool.append(row)
+        self.row_state.append([None] * len(row))
+        self.row_mapped.append(False)
+
+    def visible_row_count(self):
+        header_height = self.header_labels[0].winfo_reqheight() + 4
+        return max(1, (self.canvas.winfo_height() - header_height) // self.row_height)
+
+    def layout(self, shown):
+        while len(self.row_pool) < shown:
+            self._add_row()
+        for slot, row in enumerate(self.row_pool):
+            if slot < shown and not self.row_mapped[slot]:
+                for col_idx, lbl in enumerate(row):
+                    lbl.grid(row=slot + 1, column=col_idx, sticky="nsew")
+                self.row_mapped[slot] = True
+            elif slot >= shown and self.row_mapped[slot]:
+                for lbl in row:
+                    lbl.grid_remove()
+                self.row_mapped[slot] = False
+
+    def paint(self, slot, idx):
+        # Reconfigure only the labels whose options changed
+        values, key = self.app.row_look(idx)
+        fg, bg, due_bg = self.app.palette[key]
+        cells = [{"text": value, "bg": bg, "fg": fg} for value in values]
+        cells[1]["font"] = ("Segoe UI", 10, "overstrike" if key[3] else "normal")
+        cells[3]["bg"] = due_bg
+        state = self.row_state[slot]
+        for col_idx, cell in enumerate(cells):
+            if state[col_idx] != cell:
+                self.row_pool[slot][col_idx].configure(**cell)
+                state[col_idx] = cell
+
+
+class CanvasRenderer(PooledRenderer):
+    """Rows drawn as rectangle and text items on the canvas itself; no widget per cell."""
+
+    def build(self, parent):
+        super().build(parent)
+        self.cell_font = tkfont.Font(family="Segoe UI", size=10)
+        self.done_font = tkfont.Font(family="Segoe UI", size=10, overstrike=1)
+        self.header_font = tkfont.Font(family="Segoe UI", size=11, weight="bold")
+        char_width = self.cell_font.measure("0")
+        self.col_px = [width * char_width + 10 for width in self.app.col_widths]
+        self.row_height = self.cell_font.metrics("linespace") + 6
+        self.header_height = self.header_font.metrics("linespace") + 12
+        self.x0 = 0
+        self.header_items = [
+            (self.canvas.create_rectangle(0, 0, 0, 0, outline="#000000"),
+             self.canvas.create_text(0, 0, text=name, font=self.header_font))
+            for name in self.app.columns
+        ]
+        self.row_items = []  # Per pooled row: (rectangle, text) item ids per column
+        self.item_state = {}  # Item id -> last options applied
+        self.canvas.bind("<Double-Button-1>", self._on_double_click)
+        for sequence, mode in CLICK_MODES:
+            self.canvas.bind(sequence, lambda e, m=mode: self._on_click(e, m))
+        self._place_header()
+
+    def apply_theme(self, theme):
+        self.canvas.configure(bg=theme["main_bg"])
+        for rect, text in self.header_items:
+            self.canvas.itemconfigure(rect, fill=theme["header_bg"])
+            self.canvas.itemconfigure(text, fill=theme["cell_fg"])
+
+    def update_headings(self):
+        for col_idx, (rect, text) in enumerate(self.header_items):
+            self.canvas.itemconfigure(text, text=self.app.heading(col_idx))
+
+    def _column_at(self, x):
+        for col_idx, (left, right) in enumerate(self._columns_x()):
+            if left <= x < right:
+                return col_idx
+        return None
+
+    def _on_click(self, event, mode=None):
+        # A click on the header sorts by that column; on a row it selects the row
+        if event.y < self.header_height:
+            col_idx = self._column_at(event.x)
+            if col_idx is not None and mode is None:
+                self.app.sort_column(col_idx)
+            return
+        slot = (event.y - self.header_height) // self.row_height
+        if slot < self.shown_rows:
+            self.app.click_row(self.shown_first + slot, mode)
+
+    def _columns_x(self):
+        x = self.x0
+        for width in self.col_px:
+            yield x, x + width
+            x += width
+
+    def _place_header(self):
+        for (rect, text), (left, right) in zip(self.header_items, self._columns_x()):
+            self.canvas.coords(rect, left, 0, right, self.header_height - 2)
+            self.canvas.coords(text, (left + right) / 2, (self.header_height - 2) / 2)
+
+    def _place_row(self, slot):
+        top = self.header_height + slot * self.row_height
+        for col_idx, ((rect, text), (left, right)) in enumerate(zip(self.row_items[slot], self._columns_x())):
+            self.canvas.coords(rect, left, top, right, top + self.row_height)
+            if col_idx == 1:
+                self.canvas.coords(text, left + 4, top + self.row_height / 2)
+            else:
+                self.canvas.coords(text, (left + right) / 2, top + self.row_height / 2)
+
+    def _on_configure(self, event=None):
+        # Keep the matrix centred; only coordinates change, no items are created
+        x0 = max((self.canvas.winfo_width() - sum(self.col_px)) // 2, 0)
+        if x0 != self.x0:
+            self.x0 = x0
+            self._place_header()
+            for slot in range(len(self.row_items)):
+                self._place_row(slot)
+        super()._on_configure(event)
+
+    def visible_row_count(self):
+        return max(1, (self.canvas.winfo_height() - self.header_height) // self.row_height)
+
+    def layout(self, shown):
+        while len(self.row_items) < shown:
+            self.row_items.append([
+                (self.canvas.create_rectangle(0, 0, 0, 0, outline="#000000"),
+                 self.canvas.create_text(0, 0, anchor="w" if col_idx == 1 else "center"))
+                for col_idx in range(len(self.app.columns))
+            ])
+            self._place_row(len(self.row_items) - 1)
+        for slot, items in enumerate(self.row_items):
+            state = tk.NORMAL if slot < shown else tk.HIDDEN
+            for rect, text in items:
+                self._configure(rect, state=state)
+                self._configure(text, state=state)
+
+    def paint(self, slot, idx):
+        values, key = self.app.row_look(idx)
+        fg, bg, due_bg = self.app.palette[key]
+        for col_idx, (rect, text) in enumerate(self.row_items[slot]):
+            self._configure(rect, fill=due_bg if col_idx == 3 else bg)
+            font = self.done_font if key[3] and col_idx == 1 else self.cell_font
+            self._configure(text, text=values[col_idx], fill=fg, font=font)
+
+    def _configure(self, item, **options):
+        # Skip itemconfigure calls that would not change anything
+        state = self.item_state.setdefault(item, {})
+        changed = {name: value for name, value in options.items() if state.get(name) != value}
+        if changed:
+            self.canvas.itemconfigure(item, **changed)
+            state.update(changed)
+
+    def _on_double_click(self, event):
+        slot = (event.y - self.header_height) // self.row_height
+        if event.y < self.header_height or slot >= self.shown_rows:
+            return
+        col_idx = self._column_at(event.x)
+        if col_idx == 0:
+            self.app.move_task(self.shown_first + slot)
+        elif col_idx == 1:
+            self.app.edit_task(self.shown_first + slot)
+
+
+def _stable_ids(order, position):
+    """
+    Ids of order that can stay put when it is rearranged into a new order.
+
+    position maps each id to its index in the new order; the result is a
+    longest run of ids already in increasing position, so every other id is
+    the fewest that have to move.
+    """
+    tails, tail_ids, back = [], [], {}
+    for task_id in order:
+        pos = position[task_id]
+        i = bisect_left(tails, pos)
+        back[task_id] = tail_ids[i - 1] if i else None
+        if i == len(tails):
+            tails.append(pos)
+            tail_ids.append(task_id)
+        else:
+            tails[i] = pos
+            tail_ids[i] = task_id
+    stable = set()
+    task_id = tail_ids[-1] if tail_ids else None
+    while task_id is not None:
+        stable.add(task_id)
+        task_id = back[task_id]
+    return stable
+
+
+class TreeviewRenderer(Renderer):
+    """
+    A single ttk.Treeview with one tag per palette entry.
+
+    Row colors live in tags, so a theme switch reconfigures a few dozen tags
+    instead of touching items. A Treeview cannot color a single cell, so the
+    due date shares its row's background here.
+
+    A layout updates the tree in place: only items that left or joined the
+    view are deleted or inserted, only items out of order are moved, and only
+    rows scrolled into view are restyled.
+    """
+
+    STYLE = "Tasks.Treeview"
+    MAX_MOVES = 200  # Items a layout moves or inserts one by one before reordering in bulk
+
+    def build(self, parent):
+        cell_font = tkfont.Font(family="Segoe UI", size=10)
+        self.done_font = tkfont.Font(family="Segoe UI", size=10, overstrike=1)
+        column_ids = [f"c{i}" for i in range(len(self.app.columns))]
+        self.tree = ttk.Treeview(parent, columns=column_ids, show="headings", selectmode="none",
+                                 style=self.STYLE)
+        self.scrollbar = ttk.Scrollbar(parent, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_yscroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        char_width = cell_font.measure("0")
+        for col_idx, (col_id, name) in enumerate(zip(column_ids, self.app.columns)):
+            self.tree.heading(col_id, text=name, command=lambda c=col_idx: self.app.sort_column(c))
+            self.tree.column(col_id, width=self.app.col_widths[col_idx] * char_width + 10,
+                             anchor="w" if col_idx == 1 else "center")
+        self.app.style.configure(self.STYLE, font=cell_font, rowheight=cell_font.metrics("linespace") + 6)
+        self.app.style.configure(f"{self.STYLE}.Heading", font=("Segoe UI", 11, "bold"))
+        self.tree.bind("<Double-Button-1>", self._on_double_click)
+        for sequence, mode in CLICK_MODES:
+            self.tree.bind(sequence, lambda e, m=mode: self._on_click(e, m))
+        self.item_state = {}  # Task id -> (values, tag) last applied
+        self.marked = set()  # Ids of items currently tagged as selected
+        self.shown = []  # Ids of the tree's items, in tree order
+        self.checked = set()  # Ids whose look was checked since the last layout
+
+    def apply_theme(self, theme):
+        style = self.app.style
+        style.configure(self.STYLE, background=theme["cell_bg"], fieldbackground=theme["main_bg"],
+                        foreground=theme["cell_fg"])
+        style.configure(f"{self.STYLE}.Heading", background=theme["header_bg"], foreground=theme["cell_fg"])
+        for key, (fg, bg, due_bg) in self.app.palette.items():
+            self.tree.tag_configure(self._tag(key), foreground=fg, background=bg,
+                                    font=self.done_font if key[3] else "")
+
+    def update_headings(self):
+        for col_idx in range(len(self.app.columns)):
+            self.tree.heading(f"c{col_idx}", text=self.app.heading(col_idx))
+
+    def _tag(self, key):
+        alt, priority, overdue, completed, selected = key
+        return f"r{int(alt)}{priority or '-'}{int(overdue)}{int(completed)}{int(selected)}"
+
+    @profiled("render.render")
+    def render(self):
+        tree = self.tree
+        rows = self.app.rows
+        ids = [task["id"] for task in rows]
+        position = {task_id: idx for idx, task_id in enumerate(ids)}
+        gone = [task_id for task_id in self.shown if task_id not in position]
+        if gone:
+            tree.delete(*gone)
+            for task_id in gone:
+                del self.item_state[task_id]
+                self.marked.discard(task_id)
+        kept = [task_id for task_id in self.shown if task_id in position]
+        stable = _stable_ids(kept, position)
+        if len(ids) - len(stable) > self.MAX_MOVES:
+            # Moving an item walks the tree to its index, so a big reorder is
+            # cheaper as one set_children call after adding the new items
+            for idx, task_id in enumerate(ids):
+                if task_id not in self.item_state:
+                    self._insert_row(idx, "end")
+            tree.set_children("", *ids)
+        else:
+            moving = [task_id for task_id in kept if task_id not in stable]
+            if moving:
+                tree.detach(*moving)
+            # The tree now holds the stable items in their new relative order,
+            # so each item that is put back can go straight to its final index
+            stable_left = len(stable)
+            for idx, task_id in enumerate(ids):
+                if task_id in stable:
+                    stable_left -= 1
+                elif task_id in self.item_state:
+                    tree.move(task_id, "", idx if stable_left else "end")
+                else:
+                    self._insert_row(idx, idx if stable_left else "end")
+        self.shown = ids
+        self.checked.clear()
+        self._paint_range(*tree.yview())
+
+    def append_rows(self, start):
+        rows = self.app.rows
+        for idx in range(start, len(rows)):
+            self._insert_row(idx, "end")
+            self.shown.append(rows[idx]["id"])
+
+    def _insert_row(self, idx, index):
+        task_id = self.app.rows[idx]["id"]
+        values, key = self.app.row_look(idx)
+        tag = self._tag(key)
+        self.tree.insert("", index, iid=task_id, values=values, tags=(tag,))
+        self.item_state[task_id] = (values, tag)
+        self.checked.add(task_id)
+        if key[4]:
+            self.marked.add(task_id)
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._paint_range(first, last)
+
+    def _paint_range(self, first, last):
+        # Restyle the rows between two yview fractions that were not checked
+        # since the last layout, so stripes and looks of rows that shifted
+        # are fixed as they come into view rather than all at once
+        rows = self.app.rows
+        count = len(rows)
+        start = max(0, int(float(first) * count) - 1)
+        stop = min(count, math.ceil(float(last) * count) + 1)
+        for idx in range(start, stop):
+            if rows[idx]["id"] not in self.checked:
+                self.repaint_row(idx)
+
+    @profiled("render.repaint_row")
+    def repaint_row(self, idx):
+        if not 0 <= idx < len(self.app.rows):
+            return
+        task_id = self.app.rows[idx]["id"]
+        values, key = self.app.row_look(idx)
+        state = (values, self._tag(key))
+        if self.item_state.get(task_id) != state:
+            self.tree.item(task_id, values=values, tags=(state[1],))
+            self.item_state[task_id] = state
+        self.checked.add(task_id)
+        if key[4]:
+            self.marked.add(task_id)
+        else:
+            self.marked.discard(task_id)
+
+    def repaint_visible(self):
+        # Colors come from tags, which apply_theme already updated; only the
+        # rows whose selection marking may have changed get a new tag
+        app = self.app
+        wanted = set(app.selection)
+        if 0 <= app.selected_row < len(app.rows):
+            wanted.add(app.rows[app.selected_row]["id"])
+        for task_id in self.marked | wanted:
+            idx = app.row_of(task_id)
+            if idx is None:
+                self.marked.discard(task_id)
+            else:
+                self.repaint_row(idx)
+
+    def scroll_to(self, idx):
+        if 0 <= idx < len(self.app.rows):
+            task_id = self.app.rows[idx]["id"]
+            if not self.tree.exists(task_id):
+                # Its row is not inserted yet; lay out the current rows now
+                # rather than rely on a frame having been requested
+                self.app.scheduler.mark_layout()
+                self.app.scheduler.flush()
+            if self.tree.exists(task_id):
+                self.tree.see(task_id)
+        return False
+
+    def _on_click(self, event, mode):
+        task_id = self.tree.identify_row(event.y)
+        if task_id:
+            self.app.click_row(self.app.row_of(task_id), mode)
+
+    def _on_double_click(self, event):
+        task_id = self.tree.identify_row(event.y)
+        if not task_id:
+            return
+        idx = self.app.row_of(task_id)
+        column = self.tree.identify_column(event.x)
+        if column == "#1":
+            self.app.move_task(idx)
+        elif column == "#2":
+            self.app.edit_task(idx)
+
+
+RENDERERS = {
+    "labels": LabelGridRenderer,
+    "canvas": CanvasRenderer,
+    "tree": TreeviewRenderer,
+}
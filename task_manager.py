@@ -1,10 +1,28 @@
+import os
+import time
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
 from datetime import datetime
-from logging_utils.log_handler import TaskManager
+from functools import lru_cache
+from logging_utils.locking import ConflictError
+from logging_utils.log_handler import PROFILE, PROFILE_LOG, TaskManager, ensure_log_dir
+from logging_utils.profiler import PROFILER, profiled
 from animations import grow_from_center, slide
+from renderers import RENDERERS, RenderScheduler
+from daemon import SUPPORTED, CommandServer
 
+# TODO_RENDERER picks how the task matrix is drawn: "labels" (default),
+# "canvas" or "tree"
+RENDERER = os.environ.get("TODO_RENDERER", "labels")
+# While tasks load in the background: tasks shown per idle-time batch, and
+# how often to look for more when none were ready
+LOAD_BATCH = 2000
+LOAD_POLL_MS = 15
+# How often to check whether another window, the CLI or the daemon saved the task file
+WATCH_MS = 1000
 
+
+@lru_cache(maxsize=None)
 def blend_colors(color1, color2, ratio=0.25):
     # Blend two hex colors (e.g. "#ff0000" and "#ffffff") by the given ratio
     c1 = [int(color1[i:i+2], 16) for i in (1, 3, 5)]
@@ -17,6 +35,8 @@ class TodoApp:
     # Remove "Edit" and "Delete" columns from columns and widths
     COLUMNS = ["#", "Task", "Priority", "Due", "Added"]
     COL_WIDTHS = [5, 40, 10, 14, 18]
+    # Sort order behind each column header; "#" is the manual order
+    COLUMN_ORDERS = [None, "desc", "priority", "due_date", "timestamp"]
 
     # Define task priorities and themes
     PRIORITIES = ["Low", "Medium", "High"]
@@ -56,10 +76,52 @@ class TodoApp:
         }
     }
 
-    def __init__(self, root):
-        # Initialize the TodoApp
+    # Priority tints blended into the row background, and the selection colors
+    PRIORITY_TINTS = {"High": "#ff0000", "Medium": "#0000ff", "Low": "#00ff00"}
+    SELECTED_BG = "#3399ff"
+    SELECTED_FG = "#ffffff"
+
+    # Compiled palettes, one per theme name (see compile_palette)
+    _palettes = {}
+
+    @classmethod
+    def compile_palette(cls, theme_mode):
+        # Resolve every (alternate row, priority, overdue, completed, selected)
+        # combination of a theme to its final (fg, bg, due date bg) colors once
+        palette = cls._palettes.get(theme_mode)
+        if palette is not None:
+            return palette
+        theme = cls.THEME[theme_mode]
+        palette = {}
+        for alt in (True, False):
+            row_bg = theme["alt_row"] if alt else theme["cell_bg"]
+            for priority in list(cls.PRIORITY_TINTS) + [None]:
+                for overdue in (True, False):
+                    for completed in (True, False):
+                        for selected in (True, False):
+                            fg = theme["done_fg"] if completed else theme["cell_fg"]
+                            bg = theme["overdue_bg"] if overdue else row_bg
+                            # Slightly tint the background based on priority (if not overdue or selected)
+                            if not overdue and not selected and priority is not None:
+                                bg = blend_colors(row_bg, cls.PRIORITY_TINTS[priority], ratio=0.18)
+                            if selected:
+                                bg, fg = cls.SELECTED_BG, cls.SELECTED_FG
+                            # Due date keeps the overdue color even on tinted rows
+                            due_bg = theme["overdue_bg"] if overdue else bg
+                            palette[(alt, priority, overdue, completed, selected)] = (fg, bg, due_bg)
+        cls._palettes[theme_mode] = palette
+        return palette
+
+    def __init__(self, root, renderer=None, progressive=False):
+        # Initialize the TodoApp; renderer is a RENDERERS name. With
+        # progressive the window comes up first, without the intro
+        # animation, and tasks fill in as a worker thread parses them
+        self.started = time.perf_counter()
+        self.startup = {}  # Startup milestones, ms since started
         self.root = root
-        self.manager = TaskManager()
+        self.manager = TaskManager(background=progressive)
+        if not self.manager.loading:
+            self.manager.archive_completed()
         self.theme_mode = "purple_green"  # Default theme
         self.columns = self.COLUMNS
         self.col_widths = self.COL_WIDTHS
@@ -67,20 +129,49 @@ class TodoApp:
         self.due_format = "%Y-%m-%d"
         self.style = ttk.Style()
         self.selected_row = 0  # Track selected row
-        self._setup_ui()
+        self.selection = set()  # Ids of further tasks marked with Ctrl/Shift
+        self.anchor_row = 0  # Row a Shift selection extends from
+        self.view = None  # Tasks matching the search filter, or None to show all
+        self.view_rows = {}  # Task id -> row in the filtered view
+        self.order = None  # SortedView of the header sort, or None for manual order
+        self.renderer = RENDERERS.get(renderer or RENDERER, RENDERERS["labels"])(self)
+        # Handlers mark what changed; the renderer paints it once per idle frame
+        self.scheduler = RenderScheduler(root, self.renderer)
+        self.resident = False  # Set by the daemon: closing the window only hides it
+        self.due_timer = None  # Pending after() for the next overdue boundary
+        self.due_timer_at = None
+        self._setup_ui(animate=not self.manager.loading)
         self.display_tasks()
+        self._schedule_due_timer()
+        self.root.after(WATCH_MS, self._watch_store)
+        self.root.after_idle(self._mark_startup, "first_paint")
+        if self.manager.loading:
+            self.root.after_idle(self._load_batch)
+        else:
+            self.root.after_idle(self._mark_startup, "interactive")
 
         # Keyboard shortcuts
         self.root.bind("<Control-n>", lambda e: self.task_entry.focus_set())
         self.root.bind("<Control-Return>", lambda e: self.add_task())
-        self.root.bind("<Control-z>", lambda e: self.undo_delete())
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
         self.root.bind_all("<Control-q>", lambda e: self.on_close())
         self.root.bind_all("<Control-Q>", lambda e: self.on_close())
         # self.root.bind("<Control-q>", lambda e: self.on_close())
         # self.root.bind("<Control-Q>", lambda e: self.on_close())
         self.root.bind("<Control-t>", lambda e: self.toggle_theme())
+        self.root.bind("<Control-f>", lambda e: self.open_search())
+        self.root.bind("<Control-A>", lambda e: self.show_archive())  # Ctrl+Shift+A
+        if PROFILER.enabled:
+            PROFILER.watch_events(self.root)
+            self.root.bind("<Control-P>", lambda e: self.toggle_profile_capture())  # Ctrl+Shift+P
+        self.root.bind("<Escape>", lambda e: (self.clear_selection(), self.close_search()))
         self.root.bind("<Up>", self.select_prev_row)
         self.root.bind("<Down>", self.select_next_row)
+        self.root.bind("<Shift-Up>", lambda e: self.extend_selection(-1))
+        self.root.bind("<Shift-Down>", lambda e: self.extend_selection(1))
+        self.root.bind("<Control-p>", lambda e: self.set_selected_priority())
+        self.root.bind("<Control-m>", lambda e: self.move_selected())
         self.root.bind("<Delete>", self.delete_selected_row)
         self.root.bind("<Control-space>", lambda e: self.toggle_selected_complete())  # Ctrl+Space to toggle completion
         self.root.bind("<Return>", lambda e: self.edit_selected_row())
@@ -104,18 +195,20 @@ class TodoApp:
     def _apply_theme(self):
         # Apply the current theme to the UI
         theme = self.THEME[self.theme_mode]
+        self.palette = self.compile_palette(self.theme_mode)
         self.root.configure(bg=theme["main_bg"])
-        self.tasks_frame.configure(bg=theme["cell_bg"])
-        self.canvas.configure(bg=theme["main_bg"])
+        self.renderer.apply_theme(theme)
         self.datetime_label.configure(bg=theme["main_bg"], fg=theme["cell_fg"])
         self.task_entry.configure(background=theme["cell_bg"], foreground=theme["cell_fg"])
         self.button_frame.configure(bg=theme["main_bg"])
+        self.search_frame.configure(bg=theme["main_bg"])
+        self.search_label.configure(bg=theme["main_bg"], fg=theme["cell_fg"])
         self.style.configure("TButton", background=theme["button_bg"], foreground=theme["button_fg"])
         self.style.configure("TEntry", fieldbackground=theme["cell_bg"], foreground=theme["cell_fg"])
         self.style.map("TButton", background=[("active", theme["header_bg"])])
 
-    def _setup_ui(self):
-        # Set up the user interface
+    def _setup_ui(self, animate=True):
+        # Set up the user interface; animate plays the grow-in intro
         self.root.title("To-Do List")
         geometry = self.manager.load_window_cfg()
         self.root.geometry(geometry if geometry else "1000x600")
@@ -130,35 +223,30 @@ class TodoApp:
         self.datetime_label.pack(pady=10)
         self._update_datetime()
 
+        # Search bar, shown with Ctrl+F; every keystroke re-filters the rows
+        self.search_frame = tk.Frame(self.main_container, bg=self.THEME[self.theme_mode]["main_bg"])
+        self.search_label = tk.Label(self.search_frame, text="Search (is:open, is:done, is:overdue, is:archived, p:high):",
+                                     bg=self.THEME[self.theme_mode]["main_bg"],
+                                     fg=self.THEME[self.theme_mode]["cell_fg"])
+        self.search_label.pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar(self.root)
+        self.search_var.trace_add("write", lambda *args: self.filter_tasks(self.search_var.get()))
+        self.search_entry = ttk.Entry(self.search_frame, width=40, textvariable=self.search_var)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+
         # Task matrix with scrollbar
         self.matrix_container = tk.Frame(self.main_container, bg=self.THEME[self.theme_mode]["main_bg"])
-        self.canvas = tk.Canvas(self.matrix_container, highlightthickness=0, bg=self.THEME[self.theme_mode]["main_bg"])
-        self.scrollbar = ttk.Scrollbar(self.matrix_container, orient="vertical", command=self.canvas.yview)
-        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tasks_frame = tk.Frame(self.canvas, bg=self.THEME[self.theme_mode]["cell_bg"])
-        self.window_id = self.canvas.create_window((0, 0), window=self.tasks_frame, anchor="n")
+        self.renderer.build(self.matrix_container)
         self.matrix_container.pack(expand=True, fill=tk.BOTH)
 
         # Now animate the container (after it has content)
-        grow_from_center(
-            self.matrix_container,
-            duration=600,
-            steps=60,
-            on_finish=lambda: self.matrix_container.pack(expand=True, fill=tk.BOTH)
-        )
-
-        # Center the matrix
-        def center_matrix(event=None):
-            canvas_width = self.canvas.winfo_width()
-            frame_width = self.tasks_frame.winfo_reqwidth()
-            x = max((canvas_width - frame_width) // 2, 0)
-            self.canvas.coords(self.window_id, x, 0)
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-        self.tasks_frame.bind("<Configure>", center_matrix)
-        self.canvas.bind("<Configure>", center_matrix)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        if animate:
+            grow_from_center(
+                self.matrix_container,
+                duration=600,
+                steps=60,
+                on_finish=lambda: self.matrix_container.pack(expand=True, fill=tk.BOTH)
+            )
 
         # Input section
         self.button_frame = tk.Frame(self.main_container, bg=self.THEME[self.theme_mode]["main_bg"])
@@ -173,13 +261,48 @@ class TodoApp:
         self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self._apply_theme()
 
-        self.main_container.pack_forget()
-        grow_from_center(
-            self.main_container,
-            duration=500,
-            steps=20,
-            on_finish=lambda: self.main_container.pack(expand=True, fill=tk.BOTH)
-        )
+        if animate:
+            self.main_container.pack_forget()
+            grow_from_center(
+                self.main_container,
+                duration=500,
+                steps=20,
+                on_finish=lambda: self.main_container.pack(expand=True, fill=tk.BOTH)
+            )
+
+    def _mark_startup(self, name):
+        # Note a startup milestone once; with profiling on it is logged too
+        if name not in self.startup:
+            elapsed = time.perf_counter() - self.started
+            self.startup[name] = round(elapsed * 1000, 1)
+            if PROFILER.enabled:
+                PROFILER.add(f"startup.{name}", elapsed)
+
+    @profiled("app.load_batch")
+    def _load_batch(self):
+        # Show the tasks parsed since the last batch; runs at idle time, so
+        # typing and clicks are handled between batches
+        start = len(self.manager.tasks)
+        added = self.manager.poll_load(LOAD_BATCH)
+        if added:
+            self._mark_startup("first_rows")
+            if self.rows is self.manager.tasks:
+                self.scheduler.mark_appended(start)
+            else:
+                self.display_tasks()
+        if not self.manager.loading:
+            self._on_loaded()
+        elif added:
+            self.root.after_idle(self._load_batch)
+        else:
+            self.root.after(LOAD_POLL_MS, self._load_batch)
+
+    def _on_loaded(self):
+        # Every task is in: archive old ones and arm the overdue timer
+        if self.manager.archive_completed():
+            self.display_tasks()
+        self._schedule_due_timer()
+        self._mark_startup("interactive")
 
     def _update_datetime(self):
         # Update the datetime label every second
@@ -187,6 +310,57 @@ class TodoApp:
         self.datetime_label.config(text=f"Current date and time: {now}")
         self.root.after(1000, self._update_datetime)
 
+    def _schedule_due_timer(self):
+        # Arm a single timer for the next moment a task becomes overdue
+        next_due = self.manager.next_due_time()
+        if next_due == self.due_timer_at and self.due_timer is not None:
+            return
+        if self.due_timer is not None:
+            self.root.after_cancel(self.due_timer)
+            self.due_timer = None
+        self.due_timer_at = next_due
+        if next_due is None:
+            return
+        delay = (next_due - datetime.now()).total_seconds() * 1000
+        # Tk timers are limited in range, so far-off boundaries are re-armed hourly
+        self.due_timer = self.root.after(int(min(max(delay, 0), 3600 * 1000)) + 1, self._on_due_timer)
+
+    @profiled("app.due_timer")
+    def _on_due_timer(self):
+        # Repaint only the rows whose overdue flag just flipped
+        self.due_timer = None
+        self.due_timer_at = None
+        changed = self.manager.refresh_overdue()
+        if self.rows is not self.manager.tasks and changed:
+            # An "is:overdue" filter may match different tasks now
+            self.display_tasks()
+        else:
+            for task_id in changed:
+                self.repaint_row(self.manager.index_of(task_id))
+        self._schedule_due_timer()
+
+    @profiled("app.watch_store")
+    def _watch_store(self):
+        # Poll the store for saves made elsewhere; only the rows of the tasks
+        # they changed are repainted
+        try:
+            records = self.manager.sync()
+            if records:
+                in_place = self.rows is self.manager.tasks and all(
+                    record["op"] == "update" and "rank" not in record["fields"] for record in records)
+                if in_place:
+                    # A record queued earlier may name a task deleted since
+                    by_id = self.manager.by_id
+                    self.repaint_rows(self.manager.index_of(record["id"])
+                                      for record in records if record["id"] in by_id)
+                else:
+                    # Rows were added, removed or reordered, or a filter or sort may place them elsewhere
+                    self.display_tasks()
+                self._schedule_due_timer()
+        finally:
+            self.root.after(WATCH_MS, self._watch_store)
+
+    @profiled("app.toggle_theme")
     def toggle_theme(self, event=None):
         # Toggle between themes
         if self.theme_mode == "light":
@@ -196,35 +370,57 @@ class TodoApp:
         else:
             self.theme_mode = "light"
         self._apply_theme()
-        self.display_tasks()
+        self.scheduler.mark_visible()
 
     def add_task(self, event=None):
         # Add a new task
         desc = self.task_entry.get().strip()
         if not desc:
             return
+        self.quick_add(desc)
+        self.task_entry.delete(0, tk.END)
+        self.task_entry.focus_set()
+
+    def quick_add(self, desc):
+        # Add a task with the default priority and due date
         priority = "High"  # Default priority
         due_date = datetime.now().strftime(self.due_format)  # Default due date
         timestamp = datetime.now().strftime(self.datetime_format)
         self.manager.add_task(desc, timestamp, priority, due_date)
-        self.task_entry.delete(0, tk.END)
+        self._schedule_due_timer()
         self.display_tasks()
-        self.task_entry.focus_set()
 
     def undo_delete(self, event=None):
         # Undo the last deleted task
         self.manager.undo_delete()
+        self._schedule_due_timer()
         self.display_tasks()
 
+    def undo(self, event=None):
+        # Undo the last change of any kind
+        if self.manager.undo():
+            self._schedule_due_timer()
+            self.display_tasks()
+
+    def redo(self, event=None):
+        # Redo the last undone change
+        if self.manager.redo():
+            self._schedule_due_timer()
+            self.display_tasks()
+
     def edit_task(self, idx):
         # Edit an existing task
-        task = self.manager.tasks[idx]
+        task = self.rows[idx]
+        task_id = task["id"]
+        if self.is_archived(task_id):
+            return
+        position = self.manager.index_of(task_id)
         task_count = len(self.manager.tasks)
 
         # Ask for new position
         new_pos = simpledialog.askinteger(
             "Edit Task Position", f"Enter new position for this task (1-{task_count}):",
-            initialvalue=idx + 1, minvalue=1, maxvalue=task_count, parent=self.root
+            initialvalue=position + 1, minvalue=1, maxvalue=task_count, parent=self.root
         )
         if new_pos is None:
             return
@@ -257,162 +453,429 @@ class TodoApp:
                 messagebox.showerror("Invalid Date", "Due date must be YYYY-MM-DD")
                 return
 
-        # Update task fields
-        self.manager.update_task(idx, desc=new_desc, priority=new_priority, due_date=new_due)
-
-        # Move task if position changed
-        if new_pos != idx + 1:
-            task = self.manager.tasks.pop(idx)
-            self.manager.tasks.insert(new_pos - 1, task)
-            self.manager.save_tasks()
-            self.selected_row = new_pos - 1
+        # Update task fields and move it if the position changed; one undo step
+        with self.manager.undo_group():
+            self.manager.update_task_by_id(task_id, desc=new_desc, priority=new_priority, due_date=new_due)
+            if new_pos != position + 1:
+                self.manager.move_task_by_id(task_id, new_pos - 1)
+        self._schedule_due_timer()
+
+        if new_pos != position + 1:
+            self._show_task(task_id)
+        elif self.rows is not self.manager.tasks:
+            # The new fields may move the task in the sort order or out of the filter
+            self._show_task(task_id)
         else:
-            self.selected_row = idx
-
-        self.display_tasks()
+            self._select_row(idx)
 
     def toggle_complete(self, idx):
         # Toggle the completion status of a task
-        self.manager.toggle_complete(idx)
-        self.display_tasks()
+        task_id = self.rows[idx]["id"]
+        if self.is_archived(task_id):
+            self.restore_task(task_id)
+            return
+        self.manager.toggle_complete_by_id(task_id)
+        self._schedule_due_timer()
+        if self.rows is not self.manager.tasks:
+            self._show_task(task_id)
+        else:
+            self.repaint_row(idx)
+
+    def restore_task(self, task_id):
+        # Offer to move an archived task back to the list
+        if messagebox.askyesno("Restore Task", "Move this task out of the archive and back to the list?"):
+            self.manager.restore_archived([task_id])
+            self._schedule_due_timer()
+            self._show_task(task_id)
 
     def confirm_delete(self, idx):
         # Confirm and delete a task
+        if self.is_archived(self.rows[idx]["id"]):
+            return
         if messagebox.askyesno("Delete Task", "Are you sure you want to delete this task?"):
-            self.manager.delete_task(idx)
+            self.manager.delete_task_by_id(self.rows[idx]["id"])
             self.display_tasks()
 
     def select_prev_row(self, event=None):
         # Select the previous row
-        if self.manager.tasks:
-            self.selected_row = max(0, self.selected_row - 1)
-            self.display_tasks()
+        if self.rows:
+            self._select_row(max(0, self.selected_row - 1))
 
     def select_next_row(self, event=None):
         # Select the next row
-        if self.manager.tasks:
-            self.selected_row = min(len(self.manager.tasks) - 1, self.selected_row + 1)
+        if self.rows:
+            self._select_row(min(len(self.rows) - 1, self.selected_row + 1))
+
+    def _select_row(self, idx):
+        # Move the selection, repainting only the rows whose look changed
+        previous = self.selected_row
+        self.selected_row = self.anchor_row = idx
+        had_selection = bool(self.selection)
+        self.selection.clear()
+        if self._scroll_to_row(idx):
             self.display_tasks()
+        elif had_selection:
+            self.scheduler.mark_visible()
+        else:
+            self.repaint_rows({previous, idx})
+
+    def click_row(self, idx, mode=None):
+        # Row click: plain selects, "toggle" (Ctrl) marks one more, "range" (Shift) extends from the anchor
+        if not 0 <= idx < len(self.rows):
+            return
+        if mode is None:
+            self._select_row(idx)
+            return
+        if mode == "toggle":
+            # The first Ctrl-click keeps the cursor row marked too
+            if not self.selection:
+                self.selection.add(self.rows[self.selected_row]["id"])
+            self.selection ^= {self.rows[idx]["id"]}
+            self.anchor_row = idx
+        else:
+            self._select_range(self.anchor_row, idx)
+        self.selected_row = idx
+        self.scheduler.mark_visible()
+
+    def extend_selection(self, step):
+        # Shift+Up/Down: grow or shrink the marked block from the anchor
+        if not self.rows:
+            return
+        idx = max(0, min(len(self.rows) - 1, self.selected_row + step))
+        self._select_range(self.anchor_row, idx)
+        self.selected_row = idx
+        if self._scroll_to_row(idx):
+            self.display_tasks()
+        else:
+            self.scheduler.mark_visible()
+
+    def _select_range(self, start, end):
+        lo, hi = sorted((max(0, min(start, len(self.rows) - 1)), end))
+        self.selection = {self.rows[row]["id"] for row in range(lo, hi + 1)}
+
+    def clear_selection(self):
+        # Drop the marked tasks, keeping the cursor row
+        if self.selection:
+            self.selection.clear()
+            self.scheduler.mark_visible()
+
+    def selected_ids(self):
+        # Ids of the marked tasks plus the cursor row, in display order
+        if not self.rows:
+            return []
+        marked = self.selection | {self.rows[self.selected_row]["id"]}
+        rows = {task_id: self.row_of(task_id) for task_id in marked if not self.is_archived(task_id)}
+        return sorted((task_id for task_id, row in rows.items() if row is not None), key=rows.get)
+
+    def _after_batch(self):
+        # One schedule check and one repaint for a whole batch operation
+        self._schedule_due_timer()
+        self.display_tasks()
 
     def edit_selected_row(self, event=None):
         # Edit the currently selected row
-        if self.manager.tasks:
+        if self.rows:
             self.edit_task(self.selected_row)
 
     def delete_selected_row(self, event=None):
-        # Delete the currently selected row
-        if self.manager.tasks:
-            self.confirm_delete(self.selected_row)
+        # Delete the currently selected row, or every marked one
+        ids = self.selected_ids()
+        if len(ids) <= 1:
+            if self.rows:
+                self.confirm_delete(self.selected_row)
+            return
+        if messagebox.askyesno("Delete Tasks", f"Are you sure you want to delete these {len(ids)} tasks?"):
+            self.manager.bulk_delete(ids)
+            self.selection.clear()
+            self._after_batch()
 
     def toggle_selected_complete(self, event=None):
-        # Toggle the completion status of the selected row
-        if self.manager.tasks:
-            self.toggle_complete(self.selected_row)
+        # Toggle the selected row; marked rows all become done, or all open if they already were
+        ids = self.selected_ids()
+        if len(ids) <= 1:
+            if self.rows:
+                self.toggle_complete(self.selected_row)
+            return
+        done = all(self.manager.by_id[task_id].get("completed", False) for task_id in ids)
+        self.manager.bulk_toggle(ids, completed=not done)
+        self._after_batch()
+
+    def set_selected_priority(self, event=None):
+        # Change the priority of the selected and marked rows at once
+        ids = self.selected_ids()
+        if not ids:
+            return
+        priority = simpledialog.askstring(
+            "Edit Priority", f"Enter new priority for {len(ids)} task(s) ({', '.join(self.PRIORITIES)}):",
+            initialvalue=self.manager.by_id[ids[0]]["priority"], parent=self.root
+        )
+        if priority in self.PRIORITIES:
+            self.manager.bulk_update(ids, priority=priority)
+            self._after_batch()
+
+    def move_selected(self, event=None):
+        # Move the selected and marked rows, in order, to a block at a new position
+        ids = self.selected_ids()
+        if not ids:
+            return
+        if len(ids) == 1:
+            self.move_task(self.selected_row)
+            return
+        task_count = len(self.manager.tasks)
+        new_pos = simpledialog.askinteger(
+            "Move Tasks", f"Enter new position for these {len(ids)} tasks (1-{task_count - len(ids) + 1}):",
+            initialvalue=self.manager.index_of(ids[0]) + 1, minvalue=1,
+            maxvalue=task_count - len(ids) + 1, parent=self.root
+        )
+        if new_pos is None:
+            return
+        self.manager.bulk_move(ids, new_pos - 1)
+        self._schedule_due_timer()
+        self._show_task(ids[0])
+
+    def _scroll_to_row(self, idx):
+        # Scroll just enough for the given task to be visible; True if the view moved
+        return self.renderer.scroll_to(idx)
 
     def display_tasks(self):
-        # Display all tasks in the matrix
-        theme = self.THEME[self.theme_mode]
-        for widget in self.tasks_frame.winfo_children():
-            widget.destroy()
-
-        # Header
-        for col_idx, col_name in enumerate(self.columns):
-            tk.Label(
-                self.tasks_frame, text=col_name, borderwidth=1, relief="solid",
-                width=self.col_widths[col_idx], bg=theme["header_bg"], fg=theme["cell_fg"],
-                font=("Segoe UI", 11, "bold"), pady=4
-            ).grid(row=0, column=col_idx, sticky="nsew", padx=2, pady=2)
-
-        now = datetime.now()
-        for idx, task in enumerate(self.manager.tasks):
-            desc = task.get("desc", "")
-            timestamp = task.get("timestamp", "")
-            completed = task.get("completed", False)
-            priority = task.get("priority", "Medium")
-            due_date = task.get("due_date", "")
-            try:
-                due_dt = datetime.strptime(due_date, self.due_format)
-                overdue = not completed and due_dt < now
-            except Exception:
-                overdue = False
-
-            fg = theme["done_fg"] if completed else theme["cell_fg"]
-            row_bg = theme["alt_row"] if idx % 2 == 0 else theme["cell_bg"]
-            bg = theme["overdue_bg"] if overdue else row_bg
-
-            # Slightly tint the background based on priority (if not overdue or selected)
-            if not overdue and idx != self.selected_row:
-                if priority == "High":
-                    bg = blend_colors(row_bg, "#ff0000", ratio=0.18)
-                elif priority == "Low":
-                    bg = blend_colors(row_bg, "#00ff00", ratio=0.18)
-                elif priority == "Medium":
-                    bg = blend_colors(row_bg, "#0000ff", ratio=0.18)
-
-            if idx == self.selected_row:
-                bg = "#3399ff"
-                fg = "#ffffff"
-
-            # Index
-            idx_lbl = tk.Label(self.tasks_frame, text=str(idx + 1), borderwidth=1, relief="solid",
-                               width=self.col_widths[0], bg=bg, fg=fg, padx=4, pady=2)
-            idx_lbl.grid(row=idx + 1, column=0, sticky="nsew")
-            idx_lbl.bind("<Double-Button-1>", lambda e, i=idx: self.move_task(i))
-
-            # Description
-            desc_lbl = tk.Label(self.tasks_frame, text=desc, borderwidth=1, relief="solid",
-                                width=self.col_widths[1], bg=bg, fg=fg, anchor="w", padx=4, pady=2,
-                                font=("Segoe UI", 10, "overstrike" if completed else "normal"))
-            desc_lbl.grid(row=idx + 1, column=1, sticky="nsew")
-            desc_lbl.bind("<Double-Button-1>", lambda e, i=idx: self.edit_task(i))
-
-            # Priority
-            tk.Label(self.tasks_frame, text=priority, borderwidth=1, relief="solid",
-                     width=self.col_widths[2], bg=bg, fg=fg, padx=4, pady=2).grid(row=idx + 1, column=2, sticky="nsew")
-
-            # Due date
-            due_bg = theme["overdue_bg"] if overdue else bg
-            tk.Label(self.tasks_frame, text=due_date, borderwidth=1, relief="solid",
-                     width=self.col_widths[3], bg=due_bg, fg=fg, padx=4, pady=2).grid(row=idx + 1, column=3, sticky="nsew")
-
-            # Added
-            tk.Label(self.tasks_frame, text=timestamp, borderwidth=1, relief="solid",
-                     width=self.col_widths[4], bg=bg, fg=fg, padx=4, pady=2).grid(row=idx + 1, column=4, sticky="nsew")
-
-        # Make columns expand
-        for col in range(len(self.columns)):
-            self.tasks_frame.grid_columnconfigure(col, weight=1)
+        # Lay out the visible tasks after the list itself changed. The view
+        # is refreshed now so the next event sees the new rows; painting
+        # waits for the scheduler's frame
+        self._refresh_view()
+        self.scheduler.mark_layout()
+
+    @property
+    def rows(self):
+        # The tasks on display: the search matches, the header sort order or the list itself
+        if self.view is not None:
+            return self.view
+        if self.order is not None:
+            return self.order
+        return self.manager.tasks
+
+    def row_of(self, task_id):
+        # Row showing a task, or None if the filter hides it
+        if self.view is not None:
+            return self.view_rows.get(task_id)
+        if task_id not in self.manager.by_id:
+            return None
+        if self.order is not None:
+            return self.order.position(task_id)
+        return self.manager.index_of(task_id)
+
+    def is_archived(self, task_id):
+        # Archived tasks are shown read-only; they are no longer in the list
+        return task_id not in self.manager.by_id
+
+    def _search(self, text):
+        # Run a search in the current sort order
+        if self.order is None:
+            self.view = self.manager.search(text)
+        else:
+            self.view = self.manager.search(text, order=self.order.order, descending=self.order.descending)
+        self.view_rows = {task["id"]: row for row, task in enumerate(self.view or ())}
+
+    def _refresh_view(self):
+        # Re-run the search, clamping the selection to the new rows
+        if self.view is not None:
+            self._search(self.search_var.get())
+        self.selected_row = max(0, min(self.selected_row, len(self.rows) - 1))
+
+    def _show_task(self, task_id):
+        # Refresh the view and select a task, if the filter still shows it
+        self._refresh_view()
+        self.scheduler.mark_layout()
+        row = self.row_of(task_id)
+        if row is not None:
+            self.selected_row = row
+            self._scroll_to_row(row)
+
+    @profiled("app.filter_tasks")
+    def filter_tasks(self, text):
+        # Show only the tasks matching a search string; the cost follows the
+        # number of matches since the lookup goes through the search index
+        self._search(text)
+        self.selected_row = 0
+        self.scheduler.mark_layout()
+        self._scroll_to_row(0)
+
+    def sort_column(self, col_idx):
+        # Header click: sort by that column, flipping direction on a repeat click
+        order = self.COLUMN_ORDERS[col_idx]
+        selected = self.rows[self.selected_row]["id"] if self.rows else None
+        if order is None:
+            self.order = None
+        else:
+            descending = self.order is not None and self.order.order == order and not self.order.descending
+            self.order = self.manager.sorted_view(order, descending)
+        self.renderer.update_headings()
+        if selected is None:
+            self.display_tasks()
+        else:
+            self._show_task(selected)
+
+    def heading(self, col_idx):
+        # Header text, marked with the direction when the column is sorted
+        text = self.columns[col_idx]
+        if self.order is not None and self.COLUMN_ORDERS[col_idx] == self.order.order:
+            text += " \u25bc" if self.order.descending else " \u25b2"
+        return text
+
+    def open_search(self, event=None):
+        # Show the search bar above the task matrix
+        if not self.search_frame.winfo_ismapped():
+            self.search_frame.pack(pady=5, before=self.matrix_container)
+        self.search_entry.focus_set()
+
+    def show_archive(self, event=None):
+        # Open the search bar on the archived tasks; further words search within them
+        self.open_search()
+        self.search_var.set("is:archived ")
+        self.search_entry.icursor(tk.END)
+
+    def close_search(self, event=None):
+        # Clear the filter and hide the search bar
+        self.search_var.set("")
+        self.search_frame.pack_forget()
+        self.task_entry.focus_set()
+
+    def repaint_row(self, idx):
+        # Repaint a single task row in place if it is currently visible
+        self.scheduler.mark_rows((idx,))
+
+    def repaint_rows(self, indices):
+        # Repaint a set of task rows in place; rows out of view are skipped
+        self.scheduler.mark_rows(indices)
+
+    def row_look(self, idx):
+        # Cell texts of a task row and its palette key
+        task = self.rows[idx]
+        priority = task.get("priority", "Medium")
+        completed = task.get("completed", False)
+        if self.rows is self.manager.tasks:
+            position = str(idx + 1)
+        elif self.is_archived(task["id"]):
+            position = "-"
+        else:
+            position = str(self.manager.index_of(task["id"]) + 1)
+        values = (
+            position,
+            task.get("desc", ""),
+            priority,
+            task.get("due_date", ""),
+            task.get("timestamp", ""),
+        )
+        key = (
+            idx % 2 == 0,
+            priority if priority in self.PRIORITY_TINTS else None,
+            self.manager.is_overdue(task),
+            completed,
+            idx == self.selected_row or task["id"] in self.selection,
+        )
+        return values, key
 
     def move_task(self, idx):
-        # Move a task to a new position
+        # Move a task to a new position; a marked task moves with the rest of the selection
+        task_id = self.rows[idx]["id"]
+        if self.is_archived(task_id):
+            return
+        if task_id in self.selection:
+            self.move_selected()
+            return
+        position = self.manager.index_of(task_id)
         task_count = len(self.manager.tasks)
         new_pos = simpledialog.askinteger(
             "Move Task", f"Enter new position for this task (1-{task_count}):",
-            initialvalue=idx + 1, minvalue=1, maxvalue=task_count, parent=self.root
+            initialvalue=position + 1, minvalue=1, maxvalue=task_count, parent=self.root
         )
-        if new_pos is None or new_pos == idx + 1:
+        if new_pos is None or new_pos == position + 1:
             return
-        task = self.manager.tasks.pop(idx)
-        self.manager.tasks.insert(new_pos - 1, task)
-        self.manager.save_tasks()
-        self.selected_row = new_pos - 1
-        self.display_tasks()
+        self.manager.move_task_by_id(task_id, new_pos - 1)
+        self._show_task(task_id)
 
     def sort_by_index(self, event=None):
         # Sort tasks by index
-        self.manager.tasks.reverse()
-        self.manager.save_tasks()
+        self.manager.set_tasks(self.manager.tasks[::-1])
         self.selected_row = 0
+        self._scroll_to_row(0)
         self.display_tasks()
 
+    def toggle_profile_capture(self):
+        # Start or stop a cProfile capture; the title shows while one is running
+        path = PROFILER.toggle_capture()
+        if path is None:
+            self.root.title("To-Do List [profiling]")
+        else:
+            self.root.title("To-Do List")
+
     def on_close(self, event=None):
-        # Handle application close
+        # Handle application close; a resident window is only hidden
+        if self.resident:
+            self.hide()
+        else:
+            self.quit()
+
+    def quit(self):
+        # Save and exit, also for a resident window. If the tasks cannot be
+        # written the window stays open unless told to discard the changes
         self.manager.save_window_cfg(self.root.geometry())
+        try:
+            self.manager.close()
+        except (OSError, ConflictError) as e:
+            if not messagebox.askyesno("Save Failed", f"Your changes could not be saved:\n{e}\n\n"
+                                       "Quit anyway and lose them?", icon="warning"):
+                return
+        PROFILER.flush()
         self.root.destroy()
 
+    def show(self):
+        # Bring the window up and give it the keyboard focus
+        self.root.deiconify()
+        self.root.lift()
+        self.root.focus_force()
+
+    def hide(self):
+        # Withdraw the window, persisting everything as a close would. If
+        # the tasks cannot be written the window stays up with an error
+        self.manager.save_window_cfg(self.root.geometry())
+        try:
+            self.manager.flush()
+        except (OSError, ConflictError) as e:
+            messagebox.showerror("Save Failed", f"Your changes could not be saved:\n{e}\n\n"
+                                 "They are kept and saving is retried.")
+            return
+        PROFILER.flush()
+        self.root.withdraw()
+
+    def toggle_visible(self):
+        # Hide the window if it is showing, otherwise show it
+        if self.root.state() == "normal" and self.root.focus_get() is not None:
+            self.hide()
+        else:
+            self.show()
+
+    def focus_entry(self):
+        # Show the window with the cursor in the new task entry
+        self.show()
+        self.task_entry.focus_set()
+
 
-def open_todo_window():
-    # Open the To-Do List application
+def open_todo_window(profile=False, daemon=False, command="show"):
+    # Open the To-Do List application; profile turns on timing instrumentation.
+    # With daemon the app stays resident after its window is closed and serves
+    # main.py commands over a Unix socket; command is the launch's own command.
+    if profile or PROFILE:
+        ensure_log_dir()
+        PROFILER.enable(PROFILE_LOG)
     root = tk.Tk()
-    app = TodoApp(root)
-    root.mainloop()
\ No newline at end of file
+    app = TodoApp(root, progressive=True)
+    server = CommandServer(app)
+    if daemon and SUPPORTED and server.start():
+        app.resident = True
+        server.dispatch(command)
+    elif command.startswith("add "):
+        app.quick_add(command[4:].strip())
+    try:
+        root.mainloop()
+    finally:
+        server.close()
\ No newline at end of file
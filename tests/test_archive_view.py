@@ -0,0 +1,63 @@
+import json
+import os
+import shutil
+import tempfile
+import tkinter as tk
+import unittest
+from unittest import mock
+
+from logging_utils import log_handler
+from logging_utils.archive import Archive
+from task_manager import TodoApp
+
+
+def _task(task_id, desc, completed):
+    return {"id": task_id, "rank": task_id, "desc": desc, "timestamp": "2020-01-01 00:00:00",
+            "completed": completed, "priority": "Low", "due_date": ""}
+
+
+class ArchiveViewTest(unittest.TestCase):
+    """The is:archived view with the Treeview renderer, whose rows are never in the task list."""
+
+    def setUp(self):
+        try:
+            self.root = tk.Tk()
+        except tk.TclError:
+            self.skipTest("no display")
+        self.root.withdraw()
+        self.addCleanup(self.root.destroy)
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "todo_tasks.json")
+        for name, value in (("LOG_FILE", path), ("CFG_FILE", os.path.join(tmp, "window_cfg.json"))):
+            patcher = mock.patch.object(log_handler, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        with open(path, "w") as f:
+            json.dump([_task(f"l{i}", f"live {i}", False) for i in range(5)], f)
+        archived = [dict(_task(f"a{i}", f"old {i}", True), completed_at="2020-01-01 00:00:00") for i in range(3)]
+        Archive(log_handler.archive_path(path)).append(archived)
+        self.app = TodoApp(self.root, renderer="tree")
+        self.app.scheduler.flush()
+
+    def shown(self):
+        return list(self.app.renderer.tree.get_children())
+
+    def test_open_archive_view(self):
+        self.app.show_archive()
+        self.app.scheduler.flush()
+        self.assertEqual(self.shown(), ["a0", "a1", "a2"])
+        self.assertEqual([task["id"] for task in self.app.rows], self.shown())
+
+    def test_move_selection_in_archive_view(self):
+        self.app.show_archive()
+        self.app.select_next_row()
+        self.app.scheduler.flush()
+        self.assertEqual(self.app.selected_row, 1)
+        self.app.close_search()
+        self.app.scheduler.flush()
+        self.assertEqual(self.shown(), [f"l{i}" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()